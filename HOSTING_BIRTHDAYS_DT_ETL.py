@@ -1,7 +1,6 @@
-
 # Import packages 
 try:
-    from PCO_ETL import GoogleAPIPush, Exporter
+    from PCO_ETL import GoogleAPIPush, Exporter, concatFrames, loadKeys, SCOPES, KEYS_FILE, SERVICE_ACCOUNT_FILE, SERVICES_BASE
     import numpy as np 
     import pandas as pd 
     import sys 
@@ -11,24 +10,9 @@ except ModuleNotFoundError:
 
 
 
-# Try to load planning centre API URL
-try:
-    SECRET = np.loadtxt(f'apikey/keys.txt', dtype = str)   
-    API_APP_ID = f"{SECRET[0]}"     
-    API_SECRET = f"{SECRET[1]}"   
-except FileNotFoundError:
-    print('API Secret KEY not found. Terminating.')
-    sys.exit()
-
-
-# Set global API fetch points
-SERVICES_BASE = 'https://api.planningcenteronline.com/services/v2'
-# Load the exporter class from the primary ETL code 
-_EXPORTER_ = Exporter(api_app_id=API_APP_ID, api_secret=API_SECRET)
-
 # Define a function to get the data and return a Pandas dataframe object 
-def getHostingBirthdays() -> object:
-    DF_TEAMS = _EXPORTER_.parseJSON(url = SERVICES_BASE + '/' + 'teams')
+def getHostingBirthdays(exporter: Exporter) -> object:
+    DF_TEAMS = exporter.parseJSON(url = SERVICES_BASE + '/' + 'teams')
     DF_TEAMS_REFINED = DF_TEAMS[["id", "attributes.name", "relationships.service_type.data.id"]]
 
     # Sort out non-hosting, non-downtown service types 
@@ -38,10 +22,8 @@ def getHostingBirthdays() -> object:
 
 
     # Get the people on the downtown hosting team 
-    DF_HOSTING_MEMBERS = pd.DataFrame()
-    for team_id in DF_HOSTING_TEAM['id'].values:
-        req_url = SERVICES_BASE +  f"/teams/{team_id}/people"
-        DF_HOSTING_MEMBERS = pd.concat([DF_HOSTING_MEMBERS, _EXPORTER_.parseJSON(url = req_url)])
+    req_urls = [SERVICES_BASE +  f"/teams/{team_id}/people" for team_id in DF_HOSTING_TEAM['id'].values]
+    DF_HOSTING_MEMBERS = concatFrames(exporter.parseJSONMany(req_urls, desc = 'Fetching hosting team members'))
 
     DF_HOSTING_MEMBERS.rename(columns = {'attributes.full_name' : 'Name', 
                                         'attributes.birthdate' : 'Birthdate'}, inplace = True)
@@ -51,15 +33,19 @@ def getHostingBirthdays() -> object:
 
 
 if __name__ == "__main__":
-    HOSTING_DF_BIRTHDAYS = getHostingBirthdays()
+    # Try to load planning centre API URL
+    try:
+        API_APP_ID, API_SECRET, SPREADSHEET_ID = loadKeys(KEYS_FILE)
+    except FileNotFoundError:
+        print('API Secret KEY not found. Terminating.')
+        sys.exit(1)
+
+    # Load the exporter class from the primary ETL code 
+    _EXPORTER_ = Exporter(api_app_id = API_APP_ID, api_secret = API_SECRET)
+    HOSTING_DF_BIRTHDAYS = getHostingBirthdays(_EXPORTER_)
 
-    SCOPES = ['https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive']
-    SERVICE_ACCOUNT_JSON = f'/Users/jacealloway/Desktop/python/pco_access/apikey/service_account.json'
-    SECRET = np.loadtxt(f'/Users/jacealloway/Desktop/python/pco_access/apikey/keys.txt', dtype = str)
-    SPREADSHEET_ID = f"{SECRET[2]}" 
     # Generate the API push engine 
-    _UPLOAD_ = GoogleAPIPush(SCOPES = SCOPES, SERVICE_ACCOUNT_JSON = SERVICE_ACCOUNT_JSON, SPREADSHEET_ID = SPREADSHEET_ID)
+    _UPLOAD_ = GoogleAPIPush(SCOPES = SCOPES, SERVICE_ACCOUNT_JSON = SERVICE_ACCOUNT_FILE, SPREADSHEET_ID = SPREADSHEET_ID)
 
     _UPLOAD_.pushData(DATAFRAME = HOSTING_DF_BIRTHDAYS, sheet_name = "dt_hosting_birthdays")
 
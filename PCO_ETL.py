@@ -9,41 +9,78 @@ try:
     import numpy as np 
     import pandas as pd 
     import requests 
-    from datetime import date, datetime, timedelta
+    from datetime import date, datetime, timedelta, timezone
     import sys 
+    import os 
+    import ssl 
     import time 
+    import re 
+    import json 
+    import hashlib 
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
     from gc import collect 
+    from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED, ALL_COMPLETED
+    import itertools 
+    import threading 
+    import asyncio 
+    import contextvars 
+    from contextlib import contextmanager
     from tqdm import tqdm 
+    from pco_dates import weekEndSunday, reformatTimestring, getTimeGap, parseTimestrings, weekEndSundays, dayGaps, dateStrings, parsePlanDates
     from googleapiclient import discovery
     from google.oauth2 import service_account
 except ModuleNotFoundError:
     print("Ensure all packages are installed. Consult 'requirements.txt'.")
 
-import warnings
-warnings.simplefilter(action='ignore', category=FutureWarning)
+# Optional async HTTP client, only needed for AsyncExporter
+try:
+    import aiohttp 
+except ModuleNotFoundError:
+    aiohttp = None
 
+# Optional Parquet engine, only needed for SnapshotStore
+try:
+    import pyarrow 
+except ModuleNotFoundError:
+    pyarrow = None
 
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None)
+import warnings
+import argparse 
 
 
-# Try to load planning centre API URL
-try:
-    SECRET = np.loadtxt(f'apikey/keys.txt', dtype = str)   
-    API_APP_ID = f"{SECRET[0]}"     
-    API_SECRET = f"{SECRET[1]}"   
-except FileNotFoundError:
-    print('API Secret KEY not found. Terminating.')
-    sys.exit()
+# API keys and the Google service account live next to this file, so scheduled runs work from any directory
+APIKEY_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'apikey')
+KEYS_FILE = os.path.join(APIKEY_DIRECTORY, 'keys.txt')
+SERVICE_ACCOUNT_FILE = os.path.join(APIKEY_DIRECTORY, 'service_account.json')
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets',
+           'https://www.googleapis.com/auth/drive']
 
 
 # Set global API fetch points
-SERVICES_BASE = 'https://api.planningcenteronline.com/services/v2'
-PEOPLE_BASE = 'https://api.planningcenteronline.com/people/v2/people'
-EMAIL_BASE = 'https://api.planningcenteronline.com/people/v2/emails'
-CAMPUS_BASE = 'https://api.planningcenteronline.com/people/v2/campuses'
-WORKFLOW_BASE = 'https://api.planningcenteronline.com/people/v2/workflows'
-GROUPS_BASE = 'https://api.planningcenteronline.com/groups/v2'
+API_ROOT = 'https://api.planningcenteronline.com'
+SERVICES_BASE = API_ROOT + '/services/v2'
+PEOPLE_BASE = API_ROOT + '/people/v2/people'
+EMAIL_BASE = API_ROOT + '/people/v2/emails'
+CAMPUS_BASE = API_ROOT + '/people/v2/campuses'
+WORKFLOW_BASE = API_ROOT + '/people/v2/workflows'
+GROUPS_BASE = API_ROOT + '/groups/v2'
+# Largest page size PCO accepts; the server default is 25
+MAX_PER_PAGE = 100
+
+# Endpoints fetched incrementally with 'where[updated_at][gte]' when an Exporter has a SyncStore. People are left out:
+# they are fetched with 'include=emails', and an email edit does not move its person's updated_at
+INCREMENTAL_ENDPOINTS = {'/people/v2/workflows/{id}/cards', 
+                         '/people/v2/people/{id}/workflow_cards/{id}/activities', 
+                         '/groups/v2/events', 
+                         '/groups/v2/events/{id}/attendances'}
+# Group attendance is usually taken some days after an event starts, so keep refetching it for this long
+ATTENDANCE_WINDOW = timedelta(days = 14)
+# Cells per values.batchUpdate when several sheets are pushed together, to keep request bodies a few MB
+MAX_BATCH_CELLS = 250000
+# Rows per value range when a sheet is written in chunks
+SHEETS_CHUNK_ROWS = 5000
+# Sheets API write requests allowed per minute per user per project
+SHEETS_WRITES_PER_MINUTE = 60
 
 
 def timeFunction(func):
@@ -60,15 +97,238 @@ def timeFunction(func):
     return wrapper 
 
 
-def safeGET(url: str, auth: tuple, max_retries: int = 5, backoff_factor: float = 1.0) -> requests.Response:
+def pooledSession(pool_size: int = 10, keep_alive: bool = True) -> requests.Session:
+    """
+    Build a persistent HTTP session whose connection pool is reused across requests,
+    so that each page fetch does not pay for a new TCP+TLS handshake.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+class RateLimiter():
+    """
+    Token bucket shared by every request made against the PCO API.
+
+    The bucket starts from PCO's documented budget (100 requests per 20 seconds) and is resized from the
+    'X-PCO-API-Request-Rate-Limit' / 'Period' headers, while 'Count' drains it to what the server says is left.
+    Callers reserve a token before each request and wait out any debt, so parallel workers are paced ahead
+    of time instead of all hitting a 429 together. Safe to share between threads and asyncio tasks.
+    """
+    def __init__(self, limit: int = 100, period: float = 20.0):
+        self.capacity = float(limit)
+        self.rate = limit / period
+        self.tokens = float(limit)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+        # Reporting counters
+        self.requests = 0
+        self.throttled = 0
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def _reserve(self) -> float:
+        """
+        Take a token (possibly going into debt) and return how long the caller must wait before using it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.requests += 1
+
+            wait_time = max(-self.tokens / self.rate, self.blocked_until - now, 0.0)
+            if wait_time > 0:
+                self.waits += 1
+                self.waited_seconds += wait_time
+            return wait_time
+
+    def acquire(self) -> None:
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquireAsync(self) -> None:
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def update(self, headers: dict) -> None:
+        """
+        Resize and drain the bucket from the PCO rate-limit headers of a response.
+        """
+        limit = headers.get('X-PCO-API-Request-Rate-Limit')
+        period = headers.get('X-PCO-API-Request-Rate-Period')
+        count = headers.get('X-PCO-API-Request-Rate-Count')
+        with self.lock:
+            self._refill(time.monotonic())
+            if limit is not None and period is not None and float(period) > 0:
+                self.capacity = float(limit)
+                self.rate = float(limit) / float(period)
+            if count is not None:
+                self.tokens = min(self.tokens, self.capacity - float(count))
+
+    def throttle(self, wait_time: float) -> None:
+        """
+        Record a 429 and hold every caller back until the server's 'Retry-After' has passed.
+        """
+        with self.lock:
+            self.throttled += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + wait_time)
+            self.tokens = min(self.tokens, 0.0)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'requests' : self.requests,
+                    'throttled' : self.throttled,
+                    'waits' : self.waits,
+                    'waited_seconds' : round(self.waited_seconds, 2)}
+
+
+class ResponseCache():
+    """
+    On-disk cache of API response bodies with their 'ETag' and 'Last-Modified' validators, one JSON file per URL.
+
+    A cached URL is requested with 'If-None-Match' / 'If-Modified-Since'; on a 304 the stored body is used instead,
+    so unchanged pages (campuses, group types, service types, workflows and steps on most nights) cost a request
+    but no download. URLs filtered on 'updated_at' change every run and are never stored.
+    """
+    def __init__(self, directory: str = 'responsecache'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok = True)
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def cacheable(url: str) -> bool:
+        return not any(key.startswith('where[updated_at]') for key, _ in parse_qsl(urlsplit(url).query))
+
+    def entryPath(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + '.json')
+
+    def lookup(self, url: str) -> dict:
+        if not self.cacheable(url):
+            return None
+        try:
+            with open(self.entryPath(url)) as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def conditionalHeaders(entry: dict) -> dict:
+        if entry is None:
+            return None
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers or None
+
+    def count(self, url: str, outcome: str, body_bytes: int = 0) -> None:
+        with self.lock:
+            counts = self.counts.setdefault(endpointKey(url), {'requests' : 0, 'not_modified' : 0, 'changed' : 0, 'new' : 0, 'uncached' : 0, 'bytes_reused' : 0})
+            counts['requests'] += 1
+            counts[outcome] += 1
+            counts['bytes_reused'] += body_bytes
+
+    def settle(self, url: str, entry: dict, status: int, headers: dict, body: bytes) -> bytes:
+        """
+        Return the body to use for a response: the stored one on a 304, otherwise the new one, which is stored
+        when the response carries a validator.
+        """
+        if status == 304 and entry is not None:
+            body = entry['body'].encode()
+            self.count(url, 'not_modified', len(body))
+            return body
+
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if not self.cacheable(url) or (etag is None and last_modified is None):
+            self.count(url, 'uncached')
+            return body
+        self.count(url, 'new' if entry is None else 'changed')
+
+        # Write to a per-thread temporary file first, so concurrent fetches never leave a half-written entry
+        temp_path = f'{self.entryPath(url)}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump({'url' : url, 'etag' : etag, 'last_modified' : last_modified, 'body' : body.decode()}, file)
+        os.replace(temp_path, self.entryPath(url))
+        return body
+
+    def report(self) -> object:
+        """
+        Return the requests per endpoint so far, split by how the cache answered them, with each endpoint's hit rate.
+        """
+        with self.lock:
+            report = pd.DataFrame.from_dict(self.counts, orient = 'index', 
+                                            columns = ['requests', 'not_modified', 'changed', 'new', 'uncached', 'bytes_reused'])
+        report['hit_rate'] = (report['not_modified'] / report['requests']).round(3)
+        return report.rename_axis('endpoint').sort_values(by = 'requests', ascending = False)
+
+    def stats(self) -> dict:
+        with self.lock:
+            requests_made = sum(counts['requests'] for counts in self.counts.values())
+            not_modified = sum(counts['not_modified'] for counts in self.counts.values())
+            return {'requests' : requests_made, 
+                    'not_modified' : not_modified, 
+                    'hit_rate' : round(not_modified / requests_made, 3) if requests_made else 0.0, 
+                    'bytes_reused' : sum(counts['bytes_reused'] for counts in self.counts.values())}
+
+
+class CachedResponse():
+    """
+    What safeGET returns when a cache is given: the status and headers of the request that was made,
+    with the body the cache settled on (the stored one on a 304).
+    """
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self) -> dict:
+        return json.loads(self.content)
+
+
+def safeGET(url: str, auth: tuple, max_retries: int = 5, backoff_factor: float = 1.0, session: requests.Session = None, limiter: RateLimiter = None, cache: ResponseCache = None, cache_key: str = None) -> requests.Response:
     """
     Performs a GET request with retries. On a 429 error, waits for the time
     specified in the 'Retry-After' header (or uses exponential backoff) before retrying.
+
+    If a session is given, its pooled connections are reused; otherwise a bare requests.get is made.
+    If a limiter is given, each attempt waits for a token first and its rate-limit headers are fed back to it.
+    If a cache is given, the request is made conditional on the validators stored under cache_key (the URL
+    itself by default), and a CachedResponse is returned; on a 304 it carries the stored body (its status_code stays 304).
     """
+    http = session if session is not None else requests
+    cache_key = url if cache_key is None else cache_key
+    entry = cache.lookup(cache_key) if cache is not None else None
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, auth=auth)
+            if limiter is not None:
+                limiter.acquire()
+            response = http.get(url, auth=auth, headers = ResponseCache.conditionalHeaders(entry))
+            if limiter is not None:
+                limiter.update(response.headers)
             response.raise_for_status()
+            if cache is not None:
+                return CachedResponse(response.status_code, response.headers, 
+                                      cache.settle(cache_key, entry, response.status_code, response.headers, response.content))
             return response
         except requests.exceptions.HTTPError as e:
             if response.status_code == 429:
@@ -78,7 +338,11 @@ def safeGET(url: str, auth: tuple, max_retries: int = 5, backoff_factor: float =
                 else:
                     wait_time = backoff_factor * (2 ** attempt)
                 print(f"429 received for URL {url}. Waiting for {wait_time} seconds before retrying.")
-                time.sleep(wait_time)
+                if limiter is not None:
+                    # The limiter makes the next acquire() wait, and holds back every other worker too
+                    limiter.throttle(wait_time)
+                else:
+                    time.sleep(wait_time)
             elif response.status_code == 404:
                 raise Exception(f"404 received for URL {url}.")
             else:
@@ -95,48 +359,140 @@ def safeGET(url: str, auth: tuple, max_retries: int = 5, backoff_factor: float =
     raise Exception(f"Failed to get URL {url} after {max_retries} attempts.")
 
 
-def weekEndSunday(input_date: str) -> str:
+async def safeGETAsync(url: str, auth: object, session: object, max_retries: int = 5, backoff_factor: float = 1.0, limiter: RateLimiter = None, cache: ResponseCache = None, cache_key: str = None) -> dict:
     """
-    Compute the week-end leading Sunday based off a given time string.
+    Asyncio counterpart of safeGET on an aiohttp session, returning the decoded JSON body.
+    Retries, 429 'Retry-After' handling, limiter pacing and conditional requests follow safeGET.
+    """
+    cache_key = url if cache_key is None else cache_key
+    entry = cache.lookup(cache_key) if cache is not None else None
+    for attempt in range(max_retries):
+        try:
+            if limiter is not None:
+                await limiter.acquireAsync()
+            async with session.get(url, auth = auth, headers = ResponseCache.conditionalHeaders(entry)) as response:
+                if limiter is not None:
+                    limiter.update(response.headers)
+                if response.status == 429:
+                    retry_after = response.headers.get("Retry-After")
+                    if retry_after is not None:
+                        wait_time = float(retry_after)
+                    else:
+                        wait_time = backoff_factor * (2 ** attempt)
+                    print(f"429 received for URL {url}. Waiting for {wait_time} seconds before retrying.")
+                    if limiter is not None:
+                        limiter.throttle(wait_time)
+                    else:
+                        await asyncio.sleep(wait_time)
+                    continue
+                elif response.status == 404:
+                    raise Exception(f"404 received for URL {url}.")
+                response.raise_for_status()
+                if cache is not None:
+                    return json.loads(cache.settle(cache_key, entry, response.status, response.headers, await response.read()))
+                return await response.json(content_type = None)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == max_retries - 1:
+                raise
+            else:
+                await asyncio.sleep(backoff_factor * (2 ** attempt))
+    raise Exception(f"Failed to get URL {url} after {max_retries} attempts.")
 
-    Input must be of format '%Y-%m-%d'
+
+def normalizePlanDates(DF_ALL_ROSTERS: object, today: date) -> object:
+    """
+    Reformat roster plan dates to '%Y-%m-%d' and flag the plans on or after today.
     """
-    format = f'%Y-%m-%d'
+    plan_dates = parsePlanDates(DF_ALL_ROSTERS['plan_date'].values)
+    DF_ALL_ROSTERS['plan_date'] = dateStrings(plan_dates).values
+    DF_ALL_ROSTERS['future_plan'] = np.where(plan_dates.values >= np.datetime64(today, 'D'), 'True', 'False')
+    return DF_ALL_ROSTERS
 
-    weekday = datetime.strptime(input_date, format).isoweekday()
-    output_date = datetime.strptime(input_date, format) + timedelta(days = int(7 - (np.ceil(weekday))  ))
-    new_string = datetime.strftime(output_date.date(), format)
 
-    return new_string
+def computeWorkflowTimedeltas(DF_ALL_DATA: object, today: date) -> object:
+    """
+    Fill the initiated/completed dates, week-end Sundays and day counts of the sorted workflow history, one column at a time.
+
+    Row for row this matches the previous per-row loop, including how a card's first history row is initiated:
+    from the previous row's history when it is the same card, otherwise from the previous row's card creation date
+    (the very first row uses its own card creation date).
+    """
+    DF_ALL_DATA = DF_ALL_DATA.reset_index(drop = True)
+    today = pd.Timestamp(today)
+
+    card_created_at = parseTimestrings(DF_ALL_DATA['card_created_at'])
+    moved_to_step_at = parseTimestrings(DF_ALL_DATA['moved_to_step_at'])
+    log_created_at = parseTimestrings(DF_ALL_DATA['log_created_at'])
+    completed = (DF_ALL_DATA['stage'] == 'completed').values
+    active = DF_ALL_DATA['stage'].isin(['snoozed', 'ready']).values
+
+    # Overwrite the card creation date value with the right format
+    DF_ALL_DATA['card_created_at'] = dateStrings(card_created_at)
 
+    # Process initiated dates
+    DF_ALL_DATA['current_day_initiated'] = dateStrings(moved_to_step_at)
+    DF_ALL_DATA['current_initiated_week_end'] = dateStrings(weekEndSundays(moved_to_step_at))
 
-def reformatTimestring(time: str) -> str:
-    old_format = f'%Y-%m-%dT%H:%M:%SZ'
-    new_format = f'%Y-%m-%d'
+    # Completed cards: time from creation to the final move, and the workflow information of the completed step
+    DF_ALL_DATA['days_in_workflow'] = np.where(completed, dayGaps(moved_to_step_at, card_created_at), 
+                                               np.where(active, dayGaps(today, card_created_at), '0'))
+    DF_ALL_DATA['card_complete_ind'] = np.where(completed, 'True', 'False')
+    DF_ALL_DATA.loc[completed, 'current_step_name'] = 'Workflow Completed'
+    DF_ALL_DATA.loc[completed, 'current_workflow_name'] = DF_ALL_DATA.loc[completed, 'history_workflow_name']
+    DF_ALL_DATA.loc[completed, 'current_workflow_campus_name'] = DF_ALL_DATA.loc[completed, 'history_workflow_primary_campus']
 
-    old_string = datetime.strptime(time, old_format)
-    new_string = datetime.strftime(old_string, new_format)
+    # Snoozed and ready cards: days at the current step so far
+    DF_ALL_DATA['current_days_at_step'] = np.where(active, dayGaps(today, moved_to_step_at), '0')
 
-    return new_string
+    # Process the workflow histories from the previous row
+    same_card = DF_ALL_DATA['card_id'].eq(DF_ALL_DATA['card_id'].shift(1)).values
+    history_day_initiated = log_created_at.shift(1).where(same_card, card_created_at.shift(1))
+    if len(history_day_initiated.index):
+        history_day_initiated.iloc[0] = card_created_at.iloc[0]
 
+    DF_ALL_DATA['history_day_initiated'] = dateStrings(history_day_initiated)
+    DF_ALL_DATA['history_initiated_week_end'] = dateStrings(weekEndSundays(history_day_initiated))
+    DF_ALL_DATA['history_day_completed'] = dateStrings(log_created_at)
+    DF_ALL_DATA['history_completed_week_end'] = dateStrings(weekEndSundays(log_created_at))
+    DF_ALL_DATA['history_days_at_step'] = dayGaps(log_created_at, history_day_initiated)
 
-def getTimeGap(time1: str, time2: str) -> str:
+    return DF_ALL_DATA
+
+
+def normalizeGroupRows(DF_GROUPS_ALL: object) -> object:
     """
-    Compute the elapsed time between two inputs. 
+    Reduce contacts to the primary phone number/email, reformat the group dates with their week-end Sundays, and build full names.
+    """
+    # Use the primary (first) phone number and email; '' where none is on file
+    DF_GROUPS_ALL['phone_number'] = firstListValue(DF_GROUPS_ALL['phone_number'].values, 'number')
+    DF_GROUPS_ALL['email_address'] = firstListValue(DF_GROUPS_ALL['email_address'].values, 'address')
 
-    Args:
-        time1: Input of format '%Y-%m-%d' (str)
-        time2: Input of format '%Y-%m-%d' (str)
+    # Process the dates as whole columns; null values (e.g. if a group has not been archived) become ''
+    for column in ['group_archived_at', 'group_created_at', 'event_starts_at', 'joined_at']:
+        dates = parseTimestrings(DF_GROUPS_ALL[column].values)
+        DF_GROUPS_ALL[column] = dateStrings(dates).values
+        DF_GROUPS_ALL[f'{column}_week_end'] = dateStrings(weekEndSundays(dates)).values
 
-    Returns: 
-        Number of days and hours between inputs (str).
+    # Concatenate names; a missing first or last name is left out rather than written as 'nan' (the old loop gave e.g. 'Ada nan')
+    DF_GROUPS_ALL['full_name'] = (DF_GROUPS_ALL['first_name'].fillna('').astype(str) + ' ' + DF_GROUPS_ALL['last_name'].fillna('').astype(str)).str.strip()
+    return DF_GROUPS_ALL
+
+
+def firstListValue(values: object, key: str) -> object:
+    """
+    Take value[0][key] from a column of lists of dicts (e.g. PCO 'phone_numbers'), with '' where the list is empty or missing.
     """
-    format = f'%Y-%m-%d'
+    # Not .str[0].str.get(key): when no row has a non-empty list, .str[0] is all NaN floats and .str.get raises
+    first = pd.Series(values, dtype = object).map(lambda value: value[0] if isinstance(value, list) and len(value) else None)
+    return first.map(lambda value: value.get(key, '') if isinstance(value, dict) else '').fillna('').to_numpy(dtype = object)
 
-    dt = datetime.strptime(time1, format) - datetime.strptime(time2, format)
-    gap = str(dt.days).replace('-', '')  
-        
-    return str(gap)
+
+def concatFrames(frames: list, ignore_index: bool = False) -> object:
+    """
+    Concatenate fetched frames in order, returning an empty dataframe when there is nothing to join.
+    """
+    return pd.concat(frames, ignore_index = ignore_index) if len(frames) else pd.DataFrame()
 
 
 @timeFunction
@@ -153,52 +509,402 @@ def dataframeCycle(dataframe: object, upload_engine: classmethod, sheet_name: st
     print(f'Dataframe removed successfully.')
 
 
+def dataframesCycle(dataframes: dict, upload_engine: classmethod, key_columns: dict = None) -> None:
+    """
+    Push several dataframes (keyed by sheet name) to the Google API in batched calls, then dump them and garbage collect.
+    """
+    print(f"Pushing dataframes to Google sheets {', '.join(dataframes)}.")
+    upload_engine.pushMany(dataframes, key_columns = key_columns)
+    dataframes.clear()
+    collect()
+    print(f'Dataframes removed successfully.')
+
+
+def rowKeys(DATAFRAME: object, key_columns: list) -> list:
+    """
+    A stable key per row from its id columns. Repeated ids are told apart by their occurrence number, in row order.
+
+    Null ids (e.g. from a left join) key as '', so rows sharing them stay apart by occurrence instead of collapsing into one 'nan' key.
+    """
+    KEYS = DATAFRAME[key_columns].fillna('').astype(str)
+    occurrence = KEYS.groupby(key_columns, sort = False, dropna = False).cumcount().astype(int).astype(str)
+    keys = KEYS[key_columns[0]]
+    for column in key_columns[1:]:
+        keys = keys + '|' + KEYS[column]
+    return (keys + '#' + occurrence).tolist()
+
+
+def diffSheetRows(previous_keys: list, previous_rows: list, keys: list, rows: list) -> tuple:
+    """
+    Lay this push's rows over the last pushed ones so that as few sheet rows as possible change.
+
+    Rows keep the position of their key from the last push. A row whose key is gone is filled by moving the last row
+    into its place, and rows with new keys are appended. Returns the keys and rows in sheet order, and the sorted
+    positions whose values changed.
+    """
+    new_rows = dict(zip(keys, rows))
+    sheet_keys, sheet_rows = list(previous_keys), list(previous_rows)
+    position = {key : i for i, key in enumerate(sheet_keys)}
+    dirty = set()
+
+    # Remove from the bottom up, so a row moved into a gap is never itself a removed one
+    for i in sorted((position[key] for key in sheet_keys if key not in new_rows), reverse = True):
+        last_key, last_row = sheet_keys.pop(), sheet_rows.pop()
+        if i < len(sheet_keys):
+            sheet_keys[i], sheet_rows[i] = last_key, last_row
+            position[last_key] = i
+            dirty.add(i)
+
+    for key, row in new_rows.items():
+        i = position.get(key)
+        if i is None:
+            sheet_keys.append(key)
+            sheet_rows.append(row)
+            dirty.add(len(sheet_keys) - 1)
+        elif sheet_rows[i] != row:
+            sheet_rows[i] = row
+            dirty.add(i)
+
+    return sheet_keys, sheet_rows, sorted(i for i in dirty if i < len(sheet_keys))
+
+
+def columnLetter(column_number: int) -> str:
+    """
+    The A1 letters of a 1-based column number: 1 -> 'A', 26 -> 'Z', 27 -> 'AA'.
+    """
+    letters = ''
+    while column_number > 0:
+        column_number, remainder = divmod(column_number - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def valueRange(sheet_name: str, first_row: int, values: list, column_count: int) -> dict:
+    """
+    A value range covering exactly the given rows, starting at column A of first_row (1-based).
+    """
+    last_row = first_row + max(len(values), 1) - 1
+    return {"range" : f"{sheet_name}!A{first_row}:{columnLetter(max(column_count, 1))}{last_row}", "values" : values}
+
+
+def batchValueRanges(value_ranges: object, max_batch_cells: int = MAX_BATCH_CELLS) -> object:
+    """
+    Group value ranges into values.batchUpdate bodies of at most max_batch_cells cells (a larger range goes on its own).
+    """
+    batch, batch_cells = [], 0
+    for value_range in value_ranges:
+        cells = sum(len(row) for row in value_range['values'])
+        if batch and batch_cells + cells > max_batch_cells:
+            yield batch
+            batch, batch_cells = [], 0
+        batch.append(value_range)
+        batch_cells += cells
+    if batch:
+        yield batch
+
+
+class SheetStateStore():
+    """
+    Local copies of the values last pushed to each sheet, with the stable row keys, for diff pushes in GoogleAPIPush.
+
+    A copy is only written after its push succeeded. Since the sheet could still drift from it (e.g. edited by hand),
+    a sheet is fully cleared and rewritten once its last full push is older than full_refresh_days.
+    """
+    def __init__(self, directory: str = 'sheetstate', full_refresh_days: int = 7):
+        self.directory = directory
+        self.full_refresh = timedelta(days = full_refresh_days)
+        os.makedirs(directory, exist_ok = True)
+
+    def statePath(self, sheet_name: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(sheet_name.encode()).hexdigest() + '.json')
+
+    def load(self, sheet_name: str) -> dict:
+        """
+        Return the last pushed state of a sheet, or None when it is due a full push.
+        """
+        try:
+            with open(self.statePath(sheet_name)) as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        full_push_at = datetime.strptime(state['full_push_at'], f'%Y-%m-%dT%H:%M:%SZ').replace(tzinfo = timezone.utc)
+        if datetime.now(timezone.utc) - full_push_at > self.full_refresh:
+            return None
+        return state
+
+    def discard(self, sheet_name: str) -> None:
+        try:
+            os.remove(self.statePath(sheet_name))
+        except FileNotFoundError:
+            pass
+
+    def save(self, sheet_name: str, state: dict) -> None:
+        # A state without 'full_push_at' comes from a full push that just went through
+        if state['full_push_at'] is None:
+            state['full_push_at'] = datetime.strftime(datetime.now(timezone.utc), f'%Y-%m-%dT%H:%M:%SZ')
+        temp_path = self.statePath(sheet_name) + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(state, file)
+        os.replace(temp_path, self.statePath(sheet_name))
+
+
 class GoogleAPIPush():
-    def __init__(self, SCOPES: list[str], SERVICE_ACCOUNT_JSON: str, SPREADSHEET_ID: str):
+    """
+    Pushes dataframes to the sheets of one spreadsheet.
+
+    Credentials are loaded and the Sheets service is built once per instance, from the discovery document bundled
+    with google-api-python-client, so no discovery fetch happens at startup. The access token is refreshed lazily by
+    google-auth whenever it is missing or expired at request time.
+
+    With a SheetStateStore, sheets pushed with stable id columns are diffed against the last push, and only the
+    changed, appended and truncated rows are sent.
+
+    Values are written in chunks of rows, several values.batchUpdate requests at a time, and chunks that fail can be
+    resent on their own with resumePush().
+    """
+    def __init__(self, SCOPES: list[str], SERVICE_ACCOUNT_JSON: str, SPREADSHEET_ID: str, api_endpoint: str = None, credentials: object = None, 
+                 sheet_state: object = None, max_workers: int = 4, limiter: RateLimiter = None, num_retries: int = 5):
         self.SCOPES = SCOPES 
         self.SERVICE_ACCOUNT_JSON = SERVICE_ACCOUNT_JSON
         self.SPREADSHEET_ID = SPREADSHEET_ID
-
-    def authenticate(self) -> str:
-        creds = service_account.Credentials.from_service_account_file(self.SERVICE_ACCOUNT_JSON, scopes = self.SCOPES)
-        return creds
+        # Copies of the last pushed values, for diff pushes of sheets with stable id columns (see pushMany)
+        self.sheet_state = sheet_state
+        # Chunks are written concurrently, within the Sheets write quota; the client retries 429s and 5xxs itself
+        self.max_workers = max_workers
+        self.limiter = limiter if limiter is not None else RateLimiter(limit = SHEETS_WRITES_PER_MINUTE, period = 60)
+        self.num_retries = num_retries
+        # Chunks of the last push that failed, and the states to save once they are resent (see resumePush)
+        self.pending = {'batches' : [], 'states' : {}}
+        self.pending_lock = threading.Lock()
+        # Overrides for pointing the client at a local stand-in of the Sheets API
+        self.api_endpoint = api_endpoint
+        self.creds = credentials
+        self.auth_lock = threading.Lock()
+        # The client's HTTP transport is not thread-safe, so each worker thread builds its own service
+        self.local = threading.local()
+
+    def authenticate(self) -> object:
+        with self.auth_lock:
+            if self.creds is None:
+                self.creds = service_account.Credentials.from_service_account_file(self.SERVICE_ACCOUNT_JSON, scopes = self.SCOPES)
+            return self.creds
+
+    def sheetsService(self) -> object:
+        service = getattr(self.local, 'service', None)
+        if service is None:
+            client_options = {'api_endpoint' : self.api_endpoint} if self.api_endpoint is not None else None
+            service = discovery.build('sheets', 'v4', credentials = self.authenticate(), client_options = client_options, 
+                                      static_discovery = True, cache_discovery = False)
+            self.local.service = service
+        return service
     
-    def sheetPush(self, DATAFRAME: object, sheet_name: str) -> None:
-        creds = self.authenticate()
-        service = discovery.build('sheets', 'v4', credentials = creds)
-
-        
+    def sheetValues(self, DATAFRAME: object) -> list:
         values = DATAFRAME.values.tolist()
         values.insert(0, DATAFRAME.columns.values.tolist()) 
-        
+        return values
+
+    def sheetChunks(self, DATAFRAME: object, sheet_name: str, chunk_rows: int = SHEETS_CHUNK_ROWS) -> object:
+        """
+        Yield the value ranges that rewrite a sheet, chunk_rows rows at a time (the header goes with the first chunk).
+
+        Rows are built from the column arrays one chunk at a time, so the whole frame is never held as a list of lists.
+        """
+        columns = [DATAFRAME[column].to_numpy(dtype = object) for column in DATAFRAME.columns]
+        for start in range(0, max(len(DATAFRAME.index), 1), chunk_rows):
+            values = [list(row) for row in zip(*(column[start:start + chunk_rows] for column in columns))]
+            if start == 0:
+                values.insert(0, DATAFRAME.columns.values.tolist())
+                yield valueRange(sheet_name, 1, values, len(columns))
+            else:
+                yield valueRange(sheet_name, start + 2, values, len(columns))
 
-        request = service.spreadsheets().values().update(
-            spreadsheetId = self.SPREADSHEET_ID, 
-            range = f"{sheet_name}!A1", 
-            valueInputOption = "USER_ENTERED",
-            body = {"values" : values}).execute()
+    def sheetPush(self, DATAFRAME: object, sheet_name: str) -> None:
+        failed = self.sendBatches(batchValueRanges(self.sheetChunks(DATAFRAME, sheet_name), MAX_BATCH_CELLS))
+        if failed:
+            raise failed[0][1]
 
 
     def sheetClear(self, sheet_name: str) -> None:
-        creds = self.authenticate()
-        service = discovery.build('sheets', 'v4', credentials = creds)
-
-        rangeAll = '{0}!A1:Z'.format(sheet_name)
-        body = {}
-        clearing = service.spreadsheets().values().clear(
+        """
+        Clear every value on a sheet. pushMany does not need this, as it resizes the grid to the frame instead.
+        """
+        # A bare sheet name is the whole sheet, whatever its width
+        self.sheetsService().spreadsheets().values().clear(
             spreadsheetId = self.SPREADSHEET_ID,
-            range = rangeAll,
-            body = body).execute()
+            range = sheet_name,
+            body = {}).execute(num_retries = self.num_retries)
 
 
 
-    def pushData(self, DATAFRAME: object, sheet_name: str) -> None:
+    def pushData(self, DATAFRAME: object, sheet_name: str, key_columns: list = None) -> None:
         # try:
-        self.sheetClear(sheet_name)
-        self.sheetPush(DATAFRAME.fillna(''), sheet_name)
-        print(f'Dataframe pushed successfully to {sheet_name}.')
+        self.pushMany({sheet_name : DATAFRAME}, key_columns = {sheet_name : key_columns} if key_columns is not None else None)
         # except errors.HttpError:
         #     print("Google sheet name range inconsistent with requested.")
+
+    def sheetRequests(self, DATAFRAME: object, sheet_name: str, key_columns: list = None, chunk_rows: int = SHEETS_CHUNK_ROWS) -> tuple:
+        """
+        Work out the requests for one sheet: its exact grid shape (rows, columns, header included), the value ranges to
+        write (at most chunk_rows rows each), and the state to save once they are sent.
+
+        Without key_columns (or a SheetStateStore) the sheet is fully rewritten, with its value ranges built lazily.
+        With them, only the rows that changed since the last push are written, plus any appended rows; rows left over
+        past the end are dropped by resizing the grid to the shape.
+        """
+        if self.sheet_state is None or key_columns is None:
+            shape = (len(DATAFRAME.index) + 1, len(DATAFRAME.columns))
+            return shape, self.sheetChunks(DATAFRAME.fillna(''), sheet_name, chunk_rows), None
+
+        # Round-trip through JSON so the values compare equal to the stored copy of the last push
+        values = json.loads(json.dumps(self.sheetValues(DATAFRAME.fillna('')), default = str))
+        header, rows = values[0], values[1:]
+        shape = (len(rows) + 1, len(header))
+        keys = rowKeys(DATAFRAME, key_columns)
+        previous = self.sheet_state.load(sheet_name)
+        if previous is None or previous['header'] != header:
+            data = [valueRange(sheet_name, 1, [header] + rows[:chunk_rows], len(header))]
+            data += [valueRange(sheet_name, start + 2, rows[start:start + chunk_rows], len(header)) for start in range(chunk_rows, len(rows), chunk_rows)]
+            return shape, data, {'header' : header, 'keys' : keys, 'rows' : rows, 'full_push_at' : None}
+
+        keys, rows, dirty = diffSheetRows(previous['keys'], previous['rows'], keys, rows)
+        data = []
+        # Write each run of consecutive changed rows as one range (row 1 is the header), split into chunks
+        run_starts = [i for j, i in enumerate(dirty) if j == 0 or dirty[j-1] != i - 1]
+        run_ends = [i for j, i in enumerate(dirty) if j == len(dirty) - 1 or dirty[j+1] != i + 1]
+        for run_start, run_end in zip(run_starts, run_ends):
+            for start in range(run_start, run_end + 1, chunk_rows):
+                data.append(valueRange(sheet_name, start + 2, rows[start:min(start + chunk_rows, run_end + 1)], len(header)))
+        return shape, data, {'header' : header, 'keys' : keys, 'rows' : rows, 'full_push_at' : previous['full_push_at']}
+
+    def sheetProperties(self) -> dict:
+        """
+        The id and grid properties of every sheet in the spreadsheet, keyed by sheet name.
+        """
+        spreadsheet = self.sheetsService().spreadsheets().get(
+            spreadsheetId = self.SPREADSHEET_ID, 
+            fields = 'sheets.properties(sheetId,title,gridProperties)').execute(num_retries = self.num_retries)
+        return {sheet['properties']['title'] : sheet['properties'] for sheet in spreadsheet.get('sheets', [])}
+
+    def resizeSheets(self, shapes: dict) -> int:
+        """
+        Resize the grid of each sheet to its (rows, columns) shape in one spreadsheets.batchUpdate, so rows and columns
+        past the frame are dropped rather than left stale, and frames wider than the grid are not cut off.
+        Frozen rows/columns are kept, as a grid cannot be made smaller than them; whatever of them lies past the frame
+        is cleared instead. Missing sheets are added. Returns the number of sheets resized or added.
+        """
+        properties = self.sheetProperties()
+        sheet_requests = []
+        resized = 0
+        for sheet_name, (frame_rows, frame_columns) in shapes.items():
+            # The Sheets API rejects an empty grid, e.g. for a frame without columns
+            row_count, column_count = max(frame_rows, 1), max(frame_columns, 1)
+            if sheet_name not in properties:
+                sheet_requests.append({'addSheet' : {'properties' : {'title' : sheet_name, 
+                                                                     'gridProperties' : {'rowCount' : row_count, 'columnCount' : column_count}}}})
+                resized += 1
+                continue
+            sheet_id = properties[sheet_name]['sheetId']
+            grid = properties[sheet_name].get('gridProperties', {})
+            row_count = max(row_count, grid.get('frozenRowCount', 0) + 1)
+            column_count = max(column_count, grid.get('frozenColumnCount', 0) + 1)
+            if (grid.get('rowCount'), grid.get('columnCount')) != (row_count, column_count):
+                sheet_requests.append({'updateSheetProperties' : {
+                    'properties' : {'sheetId' : sheet_id, 
+                                    'gridProperties' : {'rowCount' : row_count, 'columnCount' : column_count}}, 
+                    'fields' : 'gridProperties.rowCount,gridProperties.columnCount'}})
+                resized += 1
+            if row_count > frame_rows:
+                sheet_requests.append({'updateCells' : {'range' : {'sheetId' : sheet_id, 'startRowIndex' : frame_rows}, 'fields' : 'userEnteredValue'}})
+            if column_count > frame_columns:
+                sheet_requests.append({'updateCells' : {'range' : {'sheetId' : sheet_id, 'startColumnIndex' : frame_columns}, 'fields' : 'userEnteredValue'}})
+
+        if sheet_requests:
+            self.limiter.acquire()
+            self.sheetsService().spreadsheets().batchUpdate(
+                spreadsheetId = self.SPREADSHEET_ID, 
+                body = {'requests' : sheet_requests}).execute(num_retries = self.num_retries)
+        return resized
+
+    def sendBatch(self, data: list) -> None:
+        self.limiter.acquire()
+        self.sheetsService().spreadsheets().values().batchUpdate(
+            spreadsheetId = self.SPREADSHEET_ID, 
+            body = {"valueInputOption" : "USER_ENTERED", "data" : data}).execute(num_retries = self.num_retries)
+
+    def sendBatches(self, batches: object) -> list:
+        """
+        Send values.batchUpdate requests concurrently, up to max_workers at a time and within the write quota of the limiter.
+        Batches are drawn from the iterable only as workers free up, so lazily built chunks are not all held at once.
+
+        Returns the (batch, exception) pairs that still failed after the client's own retries.
+        """
+        failed = []
+        with ThreadPoolExecutor(max_workers = self.max_workers) as executor:
+            in_flight = {}
+            for data in itertools.chain(batches, [None]):
+                if len(in_flight) >= self.max_workers or (data is None and in_flight):
+                    done, _ = wait(in_flight, return_when = FIRST_COMPLETED if data is not None else ALL_COMPLETED)
+                    for future in done:
+                        if future.exception() is not None:
+                            failed.append((in_flight[future], future.exception()))
+                        del in_flight[future]
+                if data is not None:
+                    in_flight[executor.submit(self.sendBatch, data)] = data
+        return failed
+
+    def pushMany(self, DATAFRAMES: dict, key_columns: dict = None, max_batch_cells: int = MAX_BATCH_CELLS, chunk_rows: int = SHEETS_CHUNK_ROWS) -> None:
+        """
+        Rewrite several sheets at once: one spreadsheets.batchUpdate resizing every sheet's grid to its frame, then
+        values.batchUpdate requests of at most max_batch_cells cells (made of chunks of at most chunk_rows rows) sent
+        concurrently. Only the cells of the frames are written, and the grid resized to the frame.
+
+        If some chunks still fail after retries, the sheets they belong to are left for resumePush(), which resends only
+        those chunks; their stored copies are dropped meanwhile so that they are fully rewritten if never resumed.
+
+        Args:
+            DATAFRAMES: Dataframes keyed by sheet name (dict)
+            key_columns: Stable id columns keyed by sheet name; with a SheetStateStore, these sheets only get their changed rows (dict)
+            max_batch_cells: Most cells per values.batchUpdate request (int)
+            chunk_rows: Most rows per value range (int)
+        """
+        key_columns = key_columns or {}
+        shapes, value_ranges, states = {}, [], {}
+        for sheet_name, DATAFRAME in DATAFRAMES.items():
+            shapes[sheet_name], data, states[sheet_name] = self.sheetRequests(DATAFRAME, sheet_name, key_columns.get(sheet_name), chunk_rows)
+            value_ranges.append(data)
+
+        resized = self.resizeSheets(shapes)
+        self.finishPush(self.sendBatches(batchValueRanges(itertools.chain(*value_ranges), max_batch_cells)), states)
+        print(f"Dataframes pushed successfully to {', '.join(DATAFRAMES)} ({resized} grids resized).")
+
+    def resumePush(self) -> None:
+        """
+        Resend the chunks of earlier pushMany calls that failed, and nothing else.
+        """
+        with self.pending_lock:
+            pending, self.pending = self.pending, {'batches' : [], 'states' : {}}
+        if not pending['batches']:
+            return
+        self.finishPush(self.sendBatches([data for data, _ in pending['batches']]), pending['states'])
+        print(f"Resumed push completed successfully.")
+
+    def finishPush(self, failed: list, states: dict) -> None:
+        failed_sheets = {value_range['range'].rsplit('!', 1)[0] for data, _ in failed for value_range in data}
+        # Only remember what was pushed once the sheet really holds it
+        for sheet_name, state in states.items():
+            if self.sheet_state is None or state is None:
+                continue
+            if sheet_name in failed_sheets:
+                self.sheet_state.discard(sheet_name)
+            else:
+                self.sheet_state.save(sheet_name, state)
+
+        # Pushes may run concurrently (see runStages), so failures are added to what is already pending
+        with self.pending_lock:
+            self.pending['batches'] += failed
+            self.pending['states'].update({sheet_name : states[sheet_name] for sheet_name in failed_sheets if sheet_name in states})
+        if failed:
+            raise Exception(f"{len(failed)} chunk(s) for {', '.join(sorted(failed_sheets))} failed to push ({failed[0][1]}); resume with resumePush().")
         
 
 
@@ -210,47 +916,645 @@ class GoogleAPIPush():
                     #####----- GET DATA FROM API -----#####
 
 
-class Exporter():
-    def __init__(self, api_app_id: str, api_secret: str):
-        self.auth = requests.auth.HTTPBasicAuth(api_app_id, api_secret)
+class PageAccumulator():
+    """
+    Collects the raw 'data' records of every fetched page so that the dataframe is built once at the end,
+    rather than concatenating a new frame for every record.
 
+    Sideloaded records from the top-level 'included' array (JSON:API 'include=') are collected too,
+    once per resource type and id, since the same related record is repeated across pages.
+    """
+    def __init__(self):
+        self.records = []
+        self.included = {}
+        self.pages = 0
+        # Set to False when a page could not be fetched and the records are partial
+        self.complete = True
+
+    def addPage(self, payload: dict) -> None:
+        data = payload.get('data', [])
+        # Single-resource endpoints return one record instead of a list
+        if isinstance(data, dict):
+            self.records.append(data)
+        else:
+            self.records.extend(data)
+
+        for record in payload.get('included', []):
+            self.included.setdefault(record.get('type'), {})[record.get('id')] = record
+        self.pages += 1
+
+    @classmethod
+    def fromSnapshot(cls, snapshot: dict) -> 'PageAccumulator':
+        """
+        Rebuild the records of a stored SyncStore snapshot, as if its pages had just been fetched.
+        """
+        pages = cls()
+        pages.records = snapshot['records']
+        pages.included = snapshot['included']
+        return pages
+
+    def toDataFrame(self) -> object:
+        return pd.json_normalize(self.records)
+
+    def includedFrames(self) -> dict:
+        """
+        Return the sideloaded records as a dict of dataframes keyed by resource type (e.g. 'Email', 'Person').
+        """
+        return {resource_type : pd.json_normalize(list(records.values())) for resource_type, records in self.included.items()}
+
+
+def withPageSize(url: str, per_page: int = MAX_PER_PAGE) -> str:
+    """
+    Add 'per_page' to a URL's query string unless it already sets one.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values = True)
+    if any(key == 'per_page' for key, _ in query):
+        return url
+    return urlunsplit(parts._replace(query = urlencode(query + [('per_page', per_page)], safe = ',[]:')))
 
-    def parseJSON(self, url: str) -> object:
-        df = pd.DataFrame()
-        while True:
+
+def withQueryParam(url: str, key: str, value: object) -> str:
+    """
+    Set a query string parameter of a URL, replacing any existing value.
+    """
+    parts = urlsplit(url)
+    query = [(name, old_value) for name, old_value in parse_qsl(parts.query, keep_blank_values = True) if name != key]
+    return urlunsplit(parts._replace(query = urlencode(query + [(key, value)], safe = ',[]:')))
+
+
+def withOffset(url: str, offset: int) -> str:
+    """
+    Set the 'offset' of a URL's query string, replacing any existing one.
+    """
+    return withQueryParam(url, 'offset', offset)
+
+
+def remainingOffsetURLs(url: str, payload: dict) -> list:
+    """
+    Build the URLs of every page after the one fetched from url, using its 'meta.total_count'.
+    Returns an empty list when the endpoint does not report a total.
+    """
+    try:
+        total_count = int(payload['meta']['total_count'])
+    except (KeyError, TypeError, ValueError):
+        return []
+
+    page_size = len(payload.get('data', []))
+    if page_size == 0:
+        return []
+    offset = int(dict(parse_qsl(urlsplit(url).query)).get('offset', 0))
+    return [withOffset(url, next_offset) for next_offset in range(offset + page_size, total_count, page_size)]
+
+
+def endpointKey(url: str) -> str:
+    """
+    Reduce a URL to its endpoint path with ids templated out, e.g. '/groups/v2/groups/{id}/memberships',
+    so that pages of an N+1 fan-out are reported together.
+    """
+    return re.sub(r'/\d+(?=/|$)', '/{id}', urlsplit(url).path)
+
+
+def normalizedURL(url: str) -> str:
+    """
+    Reduce a URL to the form used as its shared frame cache key: lowercase scheme and host, no trailing slash,
+    query parameters sorted and 'per_page' dropped (the exporter always sets it).
+    """
+    parts = urlsplit(url)
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values = True) if key != 'per_page')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), urlencode(query, safe = ',[]:'), ''))
+
+
+# The generator (or pipeline) on whose behalf frames are being fetched, set by Exporter.consumingFrames
+FRAME_CONSUMER = contextvars.ContextVar('FRAME_CONSUMER', default = None)
+
+
+def shareFrames(frames: tuple) -> tuple:
+    """
+    Hand out a (frame, sideloaded frames) pair from the shared frame cache. Every caller gets its own copies,
+    so its in-place edits never reach the cache or any other caller.
+    """
+    df, included = frames
+    return df.copy(), {resource_type : frame.copy() for resource_type, frame in included.items()}
+
+
+def linkIncluded(DF_PRIMARY: object, DF_INCLUDED: object, relationship: str, parent: str) -> object:
+    """
+    Attach primary record ids to sideloaded records of a to-many relationship (e.g. a person's 'emails').
+
+    The linkage in 'relationships.{relationship}.data' of each primary record is used, so the result carries
+    a 'relationships.{parent}.data.id' column, the same shape as fetching the related endpoint on its own.
+    """
+    column = f'relationships.{relationship}.data'
+    parent_column = f'relationships.{parent}.data.id'
+
+    links = DF_PRIMARY[['id', column]].explode(column).dropna(subset = [column])
+    DF_LINKS = pd.DataFrame({parent_column : links['id'].values, 
+                             'id' : [link['id'] for link in links[column].values]})
+    return pd.merge(DF_LINKS, DF_INCLUDED.drop(columns = [parent_column], errors = 'ignore'), how = 'inner', on = 'id')
+
+
+def nextPageURL(payload: dict) -> str:
+    """
+    Return the 'links.next' URL of a JSON:API page, or None on the last page.
+    """
+    try:
+        return payload["links"]["next"] or None
+    except (KeyError, TypeError):
+        return None
+
+
+def mergeRecords(old_records: list, new_records: list) -> list:
+    """
+    Merge changed records into a snapshot by id: updated records replace their old copy in place, new ones are appended.
+    """
+    merged = {record.get('id') : record for record in old_records}
+    merged.update({record.get('id') : record for record in new_records})
+    return list(merged.values())
+
+
+class SyncStore():
+    """
+    Local state for incremental syncs: a last-sync watermark per endpoint URL and a snapshot of its raw records.
+
+    Watermarks live in 'state.json' and are only written by save(), so an interrupted run leaves the previous
+    watermarks in place and the next run refetches rather than missing changes. Deleted records cannot be seen
+    through an 'updated_at' filter, so each endpoint is fully refetched once its last full sync is older than
+    full_refresh_days. With force_full, every endpoint is fully refetched this run and its state rebuilt from that.
+    """
+    def __init__(self, directory: str = 'syncstate', full_refresh_days: int = 7, force_full: bool = False):
+        self.directory = directory
+        self.full_refresh = timedelta(days = full_refresh_days)
+        self.force_full = force_full
+        os.makedirs(os.path.join(directory, 'records'), exist_ok = True)
+
+        self.state_path = os.path.join(directory, 'state.json')
+        try:
+            with open(self.state_path) as file:
+                self.state = json.load(file)
+        except FileNotFoundError:
+            self.state = {}
+        self.lock = threading.Lock()
+
+    def recordsPath(self, url: str) -> str:
+        return os.path.join(self.directory, 'records', hashlib.sha1(url.encode()).hexdigest() + '.json')
+
+    def watermark(self, url: str) -> str:
+        """
+        Return the watermark to filter changes from, or None when the endpoint is due a full fetch.
+        """
+        with self.lock:
+            entry = self.state.get(url)
+        if entry is None or self.force_full:
+            return None
+        full_sync = datetime.strptime(entry['full_sync'], f'%Y-%m-%dT%H:%M:%SZ').replace(tzinfo = timezone.utc)
+        if datetime.now(timezone.utc) - full_sync > self.full_refresh:
+            return None
+        return entry['watermark']
+
+    def loadSnapshot(self, url: str) -> dict:
+        try:
+            with open(self.recordsPath(url)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def saveSnapshot(self, url: str, pages: PageAccumulator, watermark: str, full_sync: bool) -> None:
+        # Write to a per-thread temporary file first, so concurrent pipelines never leave a half-written snapshot
+        temp_path = f'{self.recordsPath(url)}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump({'records' : pages.records, 'included' : pages.included}, file)
+        os.replace(temp_path, self.recordsPath(url))
+        with self.lock:
+            entry = self.state.setdefault(url, {'full_sync' : watermark})
+            entry['watermark'] = watermark
+            if full_sync:
+                entry['full_sync'] = watermark
+
+    def save(self) -> None:
+        with self.lock:
+            temp_path = self.state_path + '.tmp'
+            with open(temp_path, 'w') as file:
+                json.dump(self.state, file)
+            os.replace(temp_path, self.state_path)
+
+
+class SnapshotStore():
+    """
+    Columnar (Parquet) snapshots of the raw endpoint frames fetched in a run, so that the join and transform stages
+    of the generators can be re-run offline through SnapshotExporter.
+
+    Each run is a directory named by its run timestamp, holding one table per endpoint (ids templated out, see
+    endpointKey) plus one per sideloaded resource type. Rows carry the URL they were fetched from in 'source_url'.
+    Nested columns (lists/dicts such as 'attributes.phone_numbers') are stored as JSON text and decoded on load.
+    """
+    def __init__(self, directory: str = 'snapshots', run_id: str = None):
+        if pyarrow is None:
+            raise ModuleNotFoundError("SnapshotStore requires 'pyarrow'. Consult 'requirements.txt'.")
+        self.directory = directory
+        if run_id == 'latest':
+            run_id = self.latestRun(directory)
+        self.run_id = run_id if run_id is not None else datetime.strftime(datetime.now(), f'%Y%m%dT%H%M%S')
+        self.run_directory = os.path.join(directory, self.run_id)
+
+        self.buffer = {}
+        self.tables = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def latestRun(directory: str = 'snapshots') -> str:
+        runs = sorted(run for run in os.listdir(directory) if os.path.isfile(os.path.join(directory, run, 'manifest.json')))
+        if not runs:
+            raise FileNotFoundError(f"No snapshot runs found in '{directory}'.")
+        return runs[-1]
+
+    @staticmethod
+    def tableName(url: str, resource_type: str = None) -> str:
+        table = endpointKey(url).strip('/').replace('{id}', 'id').replace('/', '__')
+        return table if resource_type is None else f'{table}.included.{resource_type}'
+
+    def manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.run_directory, 'manifest.json')) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    # Recording ------------------------------------------------------------------------------------------------------------
+
+    def record(self, url: str, df: object, included: dict = None) -> None:
+        with self.lock:
+            for resource_type, frame in [(None, df)] + list((included or {}).items()):
+                if len(frame.index):
+                    self.buffer.setdefault(self.tableName(url, resource_type), []).append(frame.assign(source_url = url))
+
+    def flush(self) -> None:
+        """
+        Write every frame recorded since the last flush as a new part of its table in this run.
+        """
+        with self.lock:
+            buffer, self.buffer = self.buffer, {}
+            if not buffer:
+                return
+            os.makedirs(self.run_directory, exist_ok = True)
+            manifest = self.manifest()
+
+            for table, frames in buffer.items():
+                df = pd.concat(frames, ignore_index = True)
+                json_columns = [column for column in df.columns if df[column].dtype == object 
+                                and df[column].map(lambda value: isinstance(value, (list, dict))).any()]
+                for column in json_columns:
+                    df[column] = df[column].map(lambda value: json.dumps(value) if isinstance(value, (list, dict)) else None)
+
+                entry = manifest.setdefault(table, {'parts' : 0, 'json_columns' : []})
+                df.to_parquet(os.path.join(self.run_directory, f"{table}.{entry['parts']}.parquet"), index = False)
+                entry['parts'] += 1
+                entry['json_columns'] = sorted(set(entry['json_columns']) | set(json_columns))
+
+            with open(os.path.join(self.run_directory, 'manifest.json'), 'w') as file:
+                json.dump(manifest, file, indent = 1)
+
+    # Replaying ------------------------------------------------------------------------------------------------------------
+
+    def loadTable(self, table: str) -> dict:
+        """
+        Load a table of this run as a dict of frames keyed by source URL, in the order they were fetched.
+        """
+        with self.lock:
+            if table not in self.tables:
+                entry = self.manifest().get(table)
+                frames = {}
+                if entry is not None:
+                    df = pd.concat([pd.read_parquet(os.path.join(self.run_directory, f'{table}.{part}.parquet')) for part in range(entry['parts'])], ignore_index = True)
+                    for column in entry['json_columns']:
+                        if column in df.columns:
+                            df[column] = df[column].map(lambda value: json.loads(value) if isinstance(value, str) else value)
+                    for url, frame in df.groupby('source_url', sort = False):
+                        frames[url] = frame.drop(columns = ['source_url']).reset_index(drop = True)
+                self.tables[table] = frames
+            return self.tables[table]
+
+    def frames(self, url: str) -> tuple:
+        """
+        Return the recorded frame and sideloaded frames for a URL, as Exporter.parseJSONIncluded would.
+        URLs that returned no records come back as empty frames.
+        """
+        df = self.loadTable(self.tableName(url)).get(url, pd.DataFrame())
+        included = {}
+        prefix = self.tableName(url) + '.included.'
+        for table in self.manifest():
+            if table.startswith(prefix):
+                frame = self.loadTable(table).get(url)
+                if frame is not None:
+                    included[table[len(prefix):]] = frame
+        return df, included
+
+
+class Exporter():
+    def __init__(self, api_app_id: str, api_secret: str, pool_size: int = 10, keep_alive: bool = True, max_workers: int = 8, limiter: RateLimiter = None, per_page: int = MAX_PER_PAGE, parallel_pages: bool = True, sync_store: SyncStore = None, snapshot_store: SnapshotStore = None, response_cache: ResponseCache = None, api_root: str = None):
+        self.auth = requests.auth.HTTPBasicAuth(api_app_id, api_secret)
+        # Requests to API_ROOT are sent here instead when set, e.g. to a local pco_mock_server
+        self.api_root = api_root.rstrip('/') if api_root else None
+        # One pooled session shared by every safeGET call made through this exporter
+        self.session = pooledSession(pool_size = pool_size, keep_alive = keep_alive)
+        # Rate budget; pass the same limiter to several exporters to share one budget
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        # Upper bound on concurrent requests for N+1 fan-outs; kept at or below the pool size
+        self.max_workers = min(max_workers, pool_size)
+        # Page size requested from every endpoint, and pages fetched per endpoint for reporting
+        self.per_page = per_page
+        self.page_counts = {}
+        self.page_counts_lock = threading.Lock()
+        # Request all remaining pages at once when the first page reports 'meta.total_count'
+        self.parallel_pages = parallel_pages
+        # Incremental mode: INCREMENTAL_ENDPOINTS only fetch records changed since the last sync
+        self.sync_store = sync_store
+        # Raw endpoint frames are recorded here for offline re-runs
+        self.snapshot_store = snapshot_store
+        # Page bodies are revalidated against this on-disk cache instead of downloaded again
+        self.response_cache = response_cache
+        # Frames of every endpoint fetched during the run, keyed by normalizedURL, so generators that need the same
+        # endpoint share one fetch; a caller arriving while the fetch is in flight waits for it instead of refetching
+        self.frame_cache = {}
+        self.frame_cache_lock = threading.Lock()
+        # The consumers (see consumingFrames) that have asked for each cached URL, so its frames can be let go
+        # once the last of them finishes
+        self.frame_consumers = {}
+
+    def close(self) -> None:
+        with self.frame_cache_lock:
+            self.frame_cache.clear()
+            self.frame_consumers.clear()
+        self.session.close()
+
+
+    def logPages(self, url: str, pages: PageAccumulator) -> None:
+        with self.page_counts_lock:
+            counts = self.page_counts.setdefault(endpointKey(url), {'fetches' : 0, 'pages' : 0, 'records' : 0, 'reused' : 0})
+            counts['fetches'] += 1
+            counts['pages'] += pages.pages
+            counts['records'] += len(pages.records)
+
+    def pageReport(self) -> object:
+        """
+        Return the number of fetches, pages and records per endpoint so far, most pages first,
+        along with how many requests for it were served from the shared frame cache.
+        """
+        with self.page_counts_lock:
+            report = pd.DataFrame.from_dict(self.page_counts, orient = 'index', columns = ['fetches', 'pages', 'records', 'reused'])
+        return report.rename_axis('endpoint').sort_values(by = 'pages', ascending = False)
+
+    def claimFrames(self, url: str) -> tuple:
+        """
+        Look up a URL in the shared frame cache. Returns its future and whether the caller is the one to fetch it.
+        """
+        key = normalizedURL(url)
+        consumer = FRAME_CONSUMER.get()
+        with self.frame_cache_lock:
+            if consumer is not None:
+                self.frame_consumers.setdefault(key, set()).add(consumer)
+            future = self.frame_cache.get(key)
+            if future is None:
+                future = self.frame_cache[key] = Future()
+                return future, True
+        with self.page_counts_lock:
+            counts = self.page_counts.setdefault(endpointKey(url), {'fetches' : 0, 'pages' : 0, 'records' : 0, 'reused' : 0})
+            counts['reused'] += 1
+        return future, False
+
+    def settleFrames(self, url: str, future: Future, pages: PageAccumulator = None, error: BaseException = None) -> None:
+        """
+        Resolve a claimed URL's future for everyone waiting on it. A failed or incomplete fetch is dropped from
+        the cache afterwards, so a later caller fetches it again instead of reusing missing records.
+        """
+        if error is None:
             try:
-                response = safeGET(url = url, auth = self.auth)
-                response_flattened = pd.json_normalize(response.json())
-            except:
-                print('Error fetching .json for {url}. Returning empty dataframe.')
-                response_flattened = pd.Dataframe()
+                future.set_result(self.toFrames(url, pages))
+            except BaseException as e:
+                error = e
+        if error is not None:
+            future.set_exception(error)
+        if error is not None or not pages.complete:
+            with self.frame_cache_lock:
+                if self.frame_cache.get(normalizedURL(url)) is future:
+                    del self.frame_cache[normalizedURL(url)]
+
+    @contextmanager
+    def consumingFrames(self) -> object:
+        """
+        Fetch on behalf of one consumer (e.g. a pipeline) for the duration of the block. On leaving it, the cached
+        frames of every URL the consumer asked for are dropped, unless a consumer that is still running asked for
+        them too; a consumer that only reaches such a URL later fetches it again.
+        """
+        consumer = object()
+        token = FRAME_CONSUMER.set(consumer)
+        try:
+            yield
+        finally:
+            FRAME_CONSUMER.reset(token)
+            self.releaseFrames(consumer)
+
+    def releaseFrames(self, consumer: object) -> None:
+        with self.frame_cache_lock:
+            for key, consumers in list(self.frame_consumers.items()):
+                consumers.discard(consumer)
+                if not consumers:
+                    del self.frame_consumers[key]
+                    self.frame_cache.pop(key, None)
+
+    def routeURL(self, url: str) -> str:
+        """
+        Point an API_ROOT URL at api_root when one is set. Only the request is rerouted; caches and stores keep the API URL.
+        """
+        if self.api_root is not None and url.startswith(API_ROOT):
+            return self.api_root + url[len(API_ROOT):]
+        return url
+
+    def fetchPage(self, url: str) -> dict:
+        """
+        Fetch a single page's JSON payload, or None if it could not be fetched.
+        """
+        try:
+            response = safeGET(url = self.routeURL(url), auth = self.auth, session = self.session, limiter = self.limiter, cache = self.response_cache, cache_key = url)
+            return response.json()
+        except:
+            print(f'Error fetching .json for {url}. Returning records fetched so far.')
+            return None
+
+    def isIncremental(self, url: str) -> bool:
+        return self.sync_store is not None and endpointKey(url) in INCREMENTAL_ENDPOINTS
+
+    def beginIncremental(self, url: str) -> tuple:
+        """
+        Work out what to request for an incremental endpoint: the URL filtered to changes since its watermark
+        (or the plain URL when a full fetch is due), the stored snapshot to merge into, and the new watermark.
+        """
+        # Overlap the previous run slightly; merging by id makes refetching a record harmless
+        started = datetime.strftime(datetime.now(timezone.utc) - timedelta(minutes = 5), f'%Y-%m-%dT%H:%M:%SZ')
+        watermark = self.sync_store.watermark(url)
+        snapshot = self.sync_store.loadSnapshot(url) if watermark is not None else None
+        if snapshot is None:
+            return url, None, started
+        return withQueryParam(url, 'where[updated_at][gte]', watermark), snapshot, started
+
+    def finishIncremental(self, url: str, snapshot: dict, changes: PageAccumulator, started: str) -> PageAccumulator:
+        """
+        Merge fetched changes into the snapshot and store it, moving the watermark forward only when every page arrived.
+        """
+        if snapshot is None:
+            pages = changes
+        else:
+            pages = PageAccumulator()
+            pages.records = mergeRecords(snapshot['records'], changes.records)
+            pages.included = snapshot['included']
+            for resource_type, records in changes.included.items():
+                pages.included.setdefault(resource_type, {}).update(records)
+            pages.pages = changes.pages
+            pages.complete = changes.complete
+
+        if pages.complete:
+            self.sync_store.saveSnapshot(url, pages, watermark = started, full_sync = snapshot is None)
+        return pages
+
+    def fetchPages(self, url: str) -> PageAccumulator:
+        if self.isIncremental(url):
+            fetch_url, snapshot, started = self.beginIncremental(url)
+            return self.finishIncremental(url, snapshot, self.fetchAllPages(fetch_url), started)
+        return self.fetchAllPages(url)
+
+    def fetchAllPages(self, url: str) -> PageAccumulator:
+        pages = PageAccumulator()
+        first_url = url
+        while True:
+            # Ask for the largest page size, including on 'links.next' pages that do not carry it
+            url = withPageSize(url, self.per_page)
+            payload = self.fetchPage(url)
+            if payload is None:
+                pages.complete = False
+                break
 
-            for i in response_flattened["data"]:
-                df = pd.concat([df, pd.json_normalize(i)], ignore_index = True)
+            pages.addPage(payload)
 
-                
             # Try to see if a next page exists; if it doesn't, break the loop.
-            try:
-                url = response_flattened["links.next"].values[0]
+            next_url = nextPageURL(payload)
+            if next_url is None:
+                break
 
-            except KeyError:
+            # Once the total is known, request every remaining offset at once (still paced by the shared limiter);
+            # endpoints without a total fall back to following 'links.next' one page at a time.
+            offset_urls = remainingOffsetURLs(url, payload) if self.parallel_pages else []
+            if offset_urls:
+                with ThreadPoolExecutor(max_workers = self.max_workers) as executor:
+                    for payload in executor.map(self.fetchPage, offset_urls):
+                        if payload is not None:
+                            pages.addPage(payload)
+                        else:
+                            pages.complete = False
                 break
+            url = next_url
+
+        self.logPages(first_url, pages)
+        return pages
 
-        return df
+    def toFrames(self, url: str, pages: PageAccumulator) -> tuple:
+        """
+        Build the frame and sideloaded frames of a fetch, recording them to the snapshot store if there is one.
+        """
+        df, included = pages.toDataFrame(), pages.includedFrames()
+        if self.snapshot_store is not None:
+            self.snapshot_store.record(url, df, included)
+        return df, included
+
+    def parseJSON(self, url: str) -> object:
+        return self.parseJSONIncluded(url)[0]
+
+    def parseJSONIncluded(self, url: str) -> tuple:
+        """
+        Fetch an endpoint requested with 'include=' and return its frame along with a dict of
+        sideloaded frames keyed by resource type.
+
+        Each endpoint is fetched once per run; later and concurrent callers share its frames.
+        """
+        future, owner = self.claimFrames(url)
+        if owner:
+            try:
+                pages = self.fetchPages(url)
+            except BaseException as e:
+                self.settleFrames(url, future, error = e)
+            else:
+                self.settleFrames(url, future, pages)
+        return shareFrames(future.result())
+
+    def parseJSONMany(self, urls: list[str], desc: str = None, included: bool = False) -> list:
+        """
+        Fetch several endpoints concurrently through a bounded thread pool.
+
+        Frames are returned in the same order as urls, regardless of which request finishes first.
+        With included = True, each element is a (frame, sideloaded frames) pair as from parseJSONIncluded.
+        """
+        parser = self.parseJSONIncluded if included else self.parseJSON
+        # Workers fetch on behalf of the caller's consumer, each in its own copy of the caller's context
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers = self.max_workers) as executor:
+            return list(tqdm(executor.map(lambda url: context.copy().run(parser, url), urls), total = len(urls), desc = desc))
+
+    def parseJSONManyChanged(self, urls: list[str], updated_at: list[str], desc: str = None) -> list:
+        """
+        N+1 fan-out over child endpoints of parent records, e.g. the activities of each workflow card.
+
+        In incremental mode a child endpoint is only requested when its parent's updated_at is missing or at/after
+        the child's own last sync (or it has no snapshot yet); every other child is read back from its snapshot.
+        Without a SyncStore this is parseJSONMany.
+        """
+        if self.sync_store is None:
+            return self.parseJSONMany(urls, desc = desc)
+
+        frames = [None] * len(urls)
+        stale = []
+        for i, (url, parent_updated_at) in enumerate(zip(urls, updated_at)):
+            watermark = self.sync_store.watermark(url)
+            snapshot = self.sync_store.loadSnapshot(url) if watermark is not None else None
+            if snapshot is None or not isinstance(parent_updated_at, str) or not parent_updated_at or parent_updated_at >= watermark:
+                stale.append(i)
+            else:
+                frames[i] = self.snapshotFrame(url, snapshot)
+
+        for i, df in zip(stale, self.parseJSONMany([urls[i] for i in stale], desc = desc)):
+            frames[i] = df
+        return frames
+
+    def snapshotFrame(self, url: str, snapshot: dict) -> object:
+        """
+        Build an unchanged child's frame from its SyncStore snapshot through toFrames, like a fetch,
+        so that it is recorded to the snapshot store and shared through the frame cache as well.
+        """
+        future, owner = self.claimFrames(url)
+        if owner:
+            self.settleFrames(url, future, PageAccumulator.fromSnapshot(snapshot))
+        return shareFrames(future.result())[0]
+
+    def checkpoint(self) -> None:
+        """
+        Persist sync watermarks and write out recorded snapshots once a generator's fetches are done.
+        """
+        if self.sync_store is not None:
+            self.sync_store.save()
+        if self.snapshot_store is not None:
+            self.snapshot_store.flush()
 
     @timeFunction
     def workflowDFGenerator(self) -> object:
         # DATA LOADING AND REFINING ---------------------------------------------------------------------------------------------------------------------
 
         #Fetch primary API data
-        pbar = tqdm(total = 4, desc = 'Fetching workflows API JSON')
+        pbar = tqdm(total = 3, desc = 'Fetching workflows API JSON')
         DF_WORKFLOWS = self.parseJSON(WORKFLOW_BASE)
         pbar.update(1)
         DF_CAMPUSES = self.parseJSON(CAMPUS_BASE)
         pbar.update(1)
-        DF_PEOPLE = self.parseJSON(PEOPLE_BASE+'?per_page=100')
-        pbar.update(1)
-        DF_EMAILS = self.parseJSON(EMAIL_BASE+'?per_page=100')
+        # Emails are sideloaded with the people in the same pages, rather than sweeping EMAIL_BASE separately
+        DF_PEOPLE, PEOPLE_INCLUDED = self.parseJSONIncluded(PEOPLE_BASE+'?include=emails')
+        DF_EMAILS = linkIncluded(DF_PEOPLE, PEOPLE_INCLUDED.get('Email', pd.DataFrame(columns = ['id', 'attributes.address'])), relationship = 'emails', parent = 'person')
         pbar.update(1)
         pbar.close()
                 
@@ -262,14 +1566,13 @@ class Exporter():
         DF_PEOPLE_REFINED = DF_PEOPLE[["id", "attributes.name", "relationships.primary_campus.data.id", "attributes.child", "attributes.gender"]]
 
         # GET PCO secondary data, workflow cards and steps 
-        DF_WORKFLOW_STEPS = pd.DataFrame()
-        DF_WORKFLOW_CARDS = pd.DataFrame()
-        for workflow_id in tqdm(DF_WORKFLOWS_REFINED["id"].values, "Fetching workflow cards and steps"):
-            req1_url = f'{WORKFLOW_BASE}/{workflow_id}/steps'
-            req2_url = f'{WORKFLOW_BASE}/{workflow_id}/cards'
-             
-            DF_WORKFLOW_STEPS = pd.concat([DF_WORKFLOW_STEPS, self.parseJSON(req1_url)], ignore_index = True)
-            DF_WORKFLOW_CARDS = pd.concat([DF_WORKFLOW_CARDS, self.parseJSON(req2_url)], ignore_index = True)
+        workflow_ids = DF_WORKFLOWS_REFINED["id"].values
+        req1_urls = [f'{WORKFLOW_BASE}/{workflow_id}/steps' for workflow_id in workflow_ids]
+        req2_urls = [f'{WORKFLOW_BASE}/{workflow_id}/cards' for workflow_id in workflow_ids]
+        # Fetch steps and cards in one fan-out, then split the results back apart
+        frames = self.parseJSONMany(req1_urls + req2_urls, desc = "Fetching workflow cards and steps")
+        DF_WORKFLOW_STEPS = concatFrames(frames[:len(req1_urls)], ignore_index = True)
+        DF_WORKFLOW_CARDS = concatFrames(frames[len(req1_urls):], ignore_index = True)
 
 
 
@@ -278,14 +1581,13 @@ class Exporter():
         DF_WORKFLOW_CARDS_REFINED = DF_WORKFLOW_CARDS[["id", "relationships.person.data.id", "relationships.assignee.data.id", "relationships.workflow.data.id", "attributes.stage", "attributes.created_at", "attributes.moved_to_step_at", "relationships.current_step.data.id"]].where(DF_WORKFLOW_CARDS["attributes.stage"] != 'removed')
         DF_WORKFLOW_CARDS_REFINED.dropna(subset = ["attributes.stage"], inplace = True) # Remove all rows where 'attributes.stage' is not 'ready' or 'completed' or 'snoozed' (only removed cards are removed)
 
-        # GET PCO tertiary data, workflow history of activities
-        DF_ALL_WORKFLOW_HISTORY = pd.DataFrame()
-        for i in tqdm(range(len(DF_WORKFLOW_CARDS_REFINED["relationships.person.data.id"].values)), "Fetching workflow card history"):
-            person_id = int(DF_WORKFLOW_CARDS_REFINED["relationships.person.data.id"].values[i])
-            card_id = int(DF_WORKFLOW_CARDS_REFINED["id"].values[i])       
-
-            req_url = f'{PEOPLE_BASE}/{person_id}/workflow_cards/{card_id}/activities'
-            DF_ALL_WORKFLOW_HISTORY = pd.concat([DF_ALL_WORKFLOW_HISTORY, self.parseJSON(url = req_url)])
+        # GET PCO tertiary data, workflow history of activities. One request per card, fanned out concurrently; order follows the cards.
+        # In incremental mode, only cards updated since their last sync are requested.
+        req_urls = [f'{PEOPLE_BASE}/{int(person_id)}/workflow_cards/{int(card_id)}/activities' 
+                    for person_id, card_id in zip(DF_WORKFLOW_CARDS_REFINED["relationships.person.data.id"].values, DF_WORKFLOW_CARDS_REFINED["id"].values)]
+        card_updated_at = DF_WORKFLOW_CARDS.get("attributes.updated_at", pd.Series(dtype = object)).reindex(DF_WORKFLOW_CARDS_REFINED.index).values
+        DF_ALL_WORKFLOW_HISTORY = concatFrames(self.parseJSONManyChanged(req_urls, card_updated_at, desc = "Fetching workflow card history"))
+        self.checkpoint()
 
 
         # Filtering
@@ -443,98 +1745,8 @@ class Exporter():
         DF_ALL_DATA.reset_index(drop = True, inplace = True)
 
 
-        # Current date information
-        today = datetime.strftime(date.today(), f'%Y-%m-%d')
-
-        # Initialize counter
-        i = 0 
-        pbar = tqdm(total = len(DF_ALL_DATA), desc = 'Computing workflow timedeltas')
-        while True: 
-            try:
-                card_stage = DF_ALL_DATA['stage'].values[i]
-                card_id = DF_ALL_DATA['card_id'].values[i]
-                current_sequence = DF_ALL_DATA['current_step_sequence'].values[i]
-
-                card_created_at = reformatTimestring(DF_ALL_DATA['card_created_at'].values[i])
-                moved_to_step_at = reformatTimestring(DF_ALL_DATA['moved_to_step_at'].values[i])
-                log_created_at = reformatTimestring(DF_ALL_DATA['log_created_at'].values[i])
-
-                DF_ALL_DATA['card_created_at'].values[i] = card_created_at # Overwrite the card creation date value with the right format
-
-            except IndexError:
-                break 
-
-            if current_sequence == 0:
-                pass
-
-
-            # Process initiated dates
-            DF_ALL_DATA['current_day_initiated'].values[i] = moved_to_step_at
-            DF_ALL_DATA['current_initiated_week_end'].values[i] = weekEndSunday(moved_to_step_at)
-
-
-            if card_stage == 'completed':
-                # Take the start and end difference
-                DF_ALL_DATA['days_in_workflow'].values[i] = getTimeGap(moved_to_step_at, card_created_at)
-                # Log the completion
-                DF_ALL_DATA['card_complete_ind'].values[i] = 'True'
-                # Populate all the missing workflow information for the completed step
-                DF_ALL_DATA['current_step_name'].values[i] = 'Workflow Completed'
-                DF_ALL_DATA['current_workflow_name'].values[i] = DF_ALL_DATA['history_workflow_name'].values[i]
-                DF_ALL_DATA['current_workflow_campus_name'].values[i] = DF_ALL_DATA['history_workflow_primary_campus'].values[i]
-
-
-            elif card_stage in ('snoozed', 'ready'):
-                # Process sequences to integers 
-                DF_ALL_DATA['current_step_sequence'].values[i] = int(DF_ALL_DATA['current_step_sequence'].values[i])
-                # Take the start and today difference
-                DF_ALL_DATA['days_in_workflow'].values[i] = getTimeGap(today, card_created_at)
-                # Compute days at step
-                DF_ALL_DATA['current_days_at_step'].values[i] = getTimeGap(today, moved_to_step_at)
-
-
-            # Process start of dataframe 
-            if i == 0:
-                DF_ALL_DATA['history_day_initiated'].values[i] = card_created_at 
-                DF_ALL_DATA['history_initiated_week_end'].values[i] = weekEndSunday(card_created_at) 
-                DF_ALL_DATA['history_day_completed'].values[i] = log_created_at
-                DF_ALL_DATA['history_completed_week_end'].values[i] = weekEndSunday(log_created_at)
-                DF_ALL_DATA['history_days_at_step'].values[i] = getTimeGap(log_created_at, card_created_at)
-
-
-            # Process end of dataframe 
-            try:
-                next_card_id = DF_ALL_DATA['card_id'].values[i+1]
-            except IndexError:
-                # Process end dates for the last row in the dataframe 
-                DF_ALL_DATA['history_day_completed'].values[i] = log_created_at
-                DF_ALL_DATA['history_completed_week_end'].values[i] = weekEndSunday(log_created_at)
-                DF_ALL_DATA['history_days_at_step'].values[i] = getTimeGap(log_created_at, DF_ALL_DATA['history_day_initiated'].values[i])
-                break 
-
-
-
-            # Process the workflow histories
-            if card_id == next_card_id:
-                DF_ALL_DATA['history_day_initiated'].values[i+1] = log_created_at
-                DF_ALL_DATA['history_initiated_week_end'].values[i+1] = weekEndSunday(log_created_at)
-
-
-            if card_id != next_card_id: 
-                DF_ALL_DATA['history_day_initiated'].values[i+1] = card_created_at
-                DF_ALL_DATA['history_initiated_week_end'].values[i+1] = weekEndSunday(DF_ALL_DATA['history_day_initiated'].values[i+1])
-
-            # Process the histories for the middle of the dataframe 
-            if i > 0:
-                DF_ALL_DATA['history_day_completed'].values[i] = log_created_at
-                DF_ALL_DATA['history_completed_week_end'].values[i] = weekEndSunday(log_created_at)
-                DF_ALL_DATA['history_days_at_step'].values[i] = getTimeGap(log_created_at, DF_ALL_DATA['history_day_initiated'].values[i])
-
-            # Increase the counter 
-            i+=1
-            pbar.update(1)
-        
-        pbar.close()
+        # Compute the workflow timedeltas as whole-column operations
+        DF_ALL_DATA = computeWorkflowTimedeltas(DF_ALL_DATA, today = date.today())
 
         # Rename the old workflow columns because they are redundant 
         DF_ALL_DATA.rename(columns = {'current_workflow_name' : 'workflow_name', 
@@ -576,13 +1788,11 @@ class Exporter():
     def groupDFGenerator(self) -> object:
         # DATA LOADING AND REFINING ---------------------------------------------------------------------------------------------------------------------
 
-        pbar = tqdm(total = 5, desc = 'Fetching groups API JSON')
+        pbar = tqdm(total = 4, desc = 'Fetching groups API JSON')
         DF_GROUPTYPE = self.parseJSON(GROUPS_BASE+'/'+'group_types')
         pbar.update(1)
         DF_EVENTS = self.parseJSON(GROUPS_BASE + '/' + 'events')
         pbar.update(1)
-        DF_GROUPS_PEOPLE = self.parseJSON(GROUPS_BASE + '/' + 'people')
-        pbar.update(1)
         DF_CAMPUSES = self.parseJSON(GROUPS_BASE + '/' + 'campuses')
         pbar.update(1)
         DF_GROUPS = self.parseJSON(GROUPS_BASE + '/' + 'groups')
@@ -594,41 +1804,40 @@ class Exporter():
         DF_GROUPS_REFINED = DF_GROUPS[['id', 'attributes.name', 'attributes.memberships_count', 'relationships.group_type.data.id', 'attributes.archived_at', 'attributes.created_at']]
         DF_GROUPTYPE_REFINED = DF_GROUPTYPE[['id', 'attributes.name']]
         DF_EVENTS_REFINED = DF_EVENTS[['id', 'attributes.name', 'attributes.visitors_count', 'relationships.group.data.id', 'attributes.starts_at']]
-        DF_GROUPS_PEOPLE_REFINED = DF_GROUPS_PEOPLE[['id', 'attributes.first_name', 'attributes.last_name', 'attributes.phone_numbers', 'attributes.email_addresses']]
-
-        DF_GROUPS_BY_CAMPUS = pd.DataFrame() 
-        for campus_id in tqdm(DF_CAMPUSES['id'].values, "Fetching groups by campus"):
-            req_url = GROUPS_BASE + f'/campuses/{campus_id}/groups'
 
-            DATA = self.parseJSON(req_url)
-            DATA['campus_id'] = campus_id
-            DF_GROUPS_BY_CAMPUS = pd.concat([DF_GROUPS_BY_CAMPUS, DATA])
+        campus_ids = DF_CAMPUSES['id'].values
+        req_urls = [GROUPS_BASE + f'/campuses/{campus_id}/groups' for campus_id in campus_ids]
+        frames = self.parseJSONMany(req_urls, desc = "Fetching groups by campus")
+        DF_GROUPS_BY_CAMPUS = concatFrames([DATA.assign(campus_id = campus_id) for DATA, campus_id in zip(frames, campus_ids)])
 
             
         # Filter out unused columns
         DF_GROUPS_BY_CAMPUS_REFINED = DF_GROUPS_BY_CAMPUS[['id', 'campus_id']]
 
-        DF_MEMBERSHIPS = pd.DataFrame() 
-        DF_GROUP_TAGS = pd.DataFrame()
-        for group_id in tqdm(DF_GROUPS['id'].values, "Fetching group memberships and tags"):
-            req_url1 = GROUPS_BASE + f'/groups/{group_id}/memberships'
-            req_url2 = GROUPS_BASE + f'/groups/{group_id}/tags'
-            DF_MEMBERSHIPS = pd.concat([DF_MEMBERSHIPS, self.parseJSON(req_url1)])
-
-            tag_data = self.parseJSON(req_url2)
-            tag_data['group_id'] = group_id
-            DF_GROUP_TAGS = pd.concat([DF_GROUP_TAGS, tag_data])
+        group_ids = DF_GROUPS['id'].values
+        req_urls1 = [GROUPS_BASE + f'/groups/{group_id}/memberships?include=person' for group_id in group_ids]
+        req_urls2 = [GROUPS_BASE + f'/groups/{group_id}/tags' for group_id in group_ids]
+        results = self.parseJSONMany(req_urls1 + req_urls2, desc = "Fetching group memberships and tags", included = True)
+        DF_MEMBERSHIPS = concatFrames([memberships for memberships, _ in results[:len(req_urls1)]])
+        # People are sideloaded with each group's memberships, rather than sweeping GROUPS_BASE/people separately
+        DF_GROUPS_PEOPLE = concatFrames([included['Person'] for _, included in results[:len(req_urls1)] if 'Person' in included]).drop_duplicates(subset = 'id')
+        DF_GROUP_TAGS = concatFrames([tag_data.assign(group_id = group_id) for (tag_data, _), group_id in zip(results[len(req_urls1):], group_ids)])
   
         # Filter out unused columns
         DF_MEMBERSHIPS_REFINED = DF_MEMBERSHIPS[['attributes.joined_at', 'relationships.group.data.id', 'relationships.person.data.id']]
+        DF_GROUPS_PEOPLE_REFINED = DF_GROUPS_PEOPLE[['id', 'attributes.first_name', 'attributes.last_name', 'attributes.phone_numbers', 'attributes.email_addresses']]
         DF_GROUP_TAGS_REFINED = DF_GROUP_TAGS[['attributes.name', 'group_id']]
 
             
         # Fetch all event attendances - note that any null event ID is dropped (there is no event, no attendance, and it doesn't exist so we cannot pull it)
-        DF_ATTENDANCES = pd.DataFrame()
-        for event_id in tqdm(DF_EVENTS_REFINED['id'].values, "Fetching events data"):
-            req_url = GROUPS_BASE + f'/events/{event_id}/attendances'
-            DF_ATTENDANCES = pd.concat([DF_ATTENDANCES, self.parseJSON(req_url)])
+        req_urls = [GROUPS_BASE + f'/events/{event_id}/attendances' for event_id in DF_EVENTS_REFINED['id'].values]
+        # In incremental mode, attendances are refetched for events updated since their last sync, 
+        # and for every event until ATTENDANCE_WINDOW after it starts, since attendance is taken after the fact
+        event_updated_at = DF_EVENTS.get('attributes.updated_at', pd.Series('', index = DF_EVENTS.index)).fillna('').values
+        attendance_open_until = (pd.to_datetime(DF_EVENTS['attributes.starts_at'], errors = 'coerce', utc = True) + ATTENDANCE_WINDOW).dt.strftime(f'%Y-%m-%dT%H:%M:%SZ').fillna('').values
+        event_changed_at = np.where(event_updated_at >= attendance_open_until, event_updated_at, attendance_open_until)
+        DF_ATTENDANCES = concatFrames(self.parseJSONManyChanged(req_urls, event_changed_at, desc = "Fetching events data"))
+        self.checkpoint()
 
         # Filter out unused columns
         DF_ATTENDANCES_REFINED = DF_ATTENDANCES[["attributes.attended", "relationships.person.data.id", "relationships.event.data.id", "attributes.role"]]
@@ -721,68 +1930,9 @@ class Exporter():
         DF_GROUPS_ALL['visitor_count'] = DF_GROUPS_ALL['visitor_count'].fillna(0)
         DF_GROUPS_ALL['group_archived_at'] = DF_GROUPS_ALL['group_archived_at'].astype(str)
 
+        # Process contacts, group dates and names column-wise
+        DF_GROUPS_ALL = normalizeGroupRows(DF_GROUPS_ALL)
 
-        DF_GROUPS_ALL['full_name'] = ''
-        DF_GROUPS_ALL['group_archived_at_week_end'] = ''
-        DF_GROUPS_ALL['group_created_at_week_end'] = ''
-        DF_GROUPS_ALL['event_starts_at_week_end'] = ''
-        DF_GROUPS_ALL['joined_at_week_end'] = ''
-        for i in tqdm(range(len(DF_GROUPS_ALL.index)), desc = "Processing group dates"):
-            
-            phone_numbers_list = DF_GROUPS_ALL['phone_number'].values[i]
-            emails_list = DF_GROUPS_ALL['email_address'].values[i]
-
-
-            # Use try-except statements in the case where an email/phone number is not on file 
-            try:
-                # The first element is always the primary number 
-                DF_GROUPS_ALL['phone_number'].values[i] = phone_numbers_list[0]['number']
-            except IndexError:
-                DF_GROUPS_ALL['phone_number'].values[i] = ''
-
-            try:
-                DF_GROUPS_ALL['email_address'].values[i] = emails_list[0]['address']
-            except IndexError:
-                DF_GROUPS_ALL['email_address'].values[i] = ''
-
-
-
-            # Process the dates, and account for null values (e.g. if a group has not been archived)
-            try:
-                DF_GROUPS_ALL['group_archived_at'].values[i] = reformatTimestring(DF_GROUPS_ALL['group_archived_at'].values[i])
-                DF_GROUPS_ALL['group_archived_at_week_end'].values[i] = weekEndSunday(DF_GROUPS_ALL['group_archived_at'].values[i])
-            except:
-                DF_GROUPS_ALL['group_archived_at'].values[i] = ''
-                DF_GROUPS_ALL['group_archived_at_week_end'].values[i] = ''
-
-            try:
-                DF_GROUPS_ALL['group_created_at'].values[i] = reformatTimestring(DF_GROUPS_ALL['group_created_at'].values[i])
-                DF_GROUPS_ALL['group_created_at_week_end'].values[i] = weekEndSunday(DF_GROUPS_ALL['group_created_at'].values[i])
-            except: 
-                DF_GROUPS_ALL['group_created_at'].values[i] = ''
-                DF_GROUPS_ALL['group_created_at_week_end'].values[i] = ''
-
-            try: 
-                DF_GROUPS_ALL['event_starts_at'].values[i] = reformatTimestring(DF_GROUPS_ALL['event_starts_at'].values[i])
-                DF_GROUPS_ALL['event_starts_at_week_end'].values[i] = weekEndSunday(DF_GROUPS_ALL['event_starts_at'].values[i])
-            except: 
-                DF_GROUPS_ALL['event_starts_at'].values[i] = ''
-                DF_GROUPS_ALL['event_starts_at_week_end'].values[i] = ''
-            
-            try:
-                DF_GROUPS_ALL['joined_at'].values[i] = reformatTimestring(DF_GROUPS_ALL['joined_at'].values[i])
-                DF_GROUPS_ALL['joined_at_week_end'].values[i] = weekEndSunday(DF_GROUPS_ALL['joined_at'].values[i])
-            except:
-                DF_GROUPS_ALL['joined_at'].values[i] = ''
-                DF_GROUPS_ALL['joined_at_week_end'].values[i] = ''
-
-
-
-            # Concatenate names
-            first_name = DF_GROUPS_ALL['first_name'].values[i]
-            last_name = DF_GROUPS_ALL['last_name'].values[i]
-            DF_GROUPS_ALL['full_name'].values[i] = f"{first_name} {last_name}"
-    
 
         return DF_GROUPS_ALL[[
                     'group_type', 
@@ -834,21 +1984,16 @@ class Exporter():
         DF_ROSTER_PEOPLE_REFINED = DF_ROSTER_PEOPLE[["id", "attributes.full_name", "attributes.passed_background_check"]]
         
 
-        DF_PLANS = pd.DataFrame()
-        for servicetype_id in tqdm(DF_SERVICE_TYPES_REFINED["id"].values, "Fetching service type plans"):
-            req_url = SERVICES_BASE + f'/service_types/{servicetype_id}/plans'
-            DF_PLANS = pd.concat([DF_PLANS, self.parseJSON(req_url)])
+        req_urls = [SERVICES_BASE + f'/service_types/{servicetype_id}/plans' for servicetype_id in DF_SERVICE_TYPES_REFINED["id"].values]
+        DF_PLANS = concatFrames(self.parseJSONMany(req_urls, desc = "Fetching service type plans"))
 
         DF_PLANS_REFINED = DF_PLANS[["id", "attributes.dates", "attributes.plan_people_count", "relationships.service_type.data.id"]]
 
 
-        DF_TEAM_MEMBERS = pd.DataFrame() 
-        for i in tqdm(range(len(DF_PLANS_REFINED.index)), "Fetching plan rosters"):
-            plan_id = DF_PLANS_REFINED["id"].values[i]
-            servicetype_id = DF_PLANS_REFINED["relationships.service_type.data.id"].values[i]
-            req_url = SERVICES_BASE +  f"/service_types/{servicetype_id}/plans/{plan_id}/team_members"
-
-            DF_TEAM_MEMBERS = pd.concat([DF_TEAM_MEMBERS, self.parseJSON(req_url)])
+        req_urls = [SERVICES_BASE +  f"/service_types/{servicetype_id}/plans/{plan_id}/team_members" 
+                    for plan_id, servicetype_id in zip(DF_PLANS_REFINED["id"].values, DF_PLANS_REFINED["relationships.service_type.data.id"].values)]
+        DF_TEAM_MEMBERS = concatFrames(self.parseJSONMany(req_urls, desc = "Fetching plan rosters"))
+        self.checkpoint()
 
 
         DF_TEAM_MEMBERS_REFINED = DF_TEAM_MEMBERS[["attributes.status", "relationships.plan.data.id", "relationships.person.data.id", "attributes.name", "relationships.scheduled_by.data.id", "relationships.service_type.data.id", "relationships.team.data.id"]]
@@ -899,84 +2044,371 @@ class Exporter():
         # Remove some null values 
         DF_ALL_ROSTERS.dropna(subset = 'plan_date', inplace = True)
         DF_ALL_ROSTERS.dropna(subset = 'person_name', inplace = True)
-        # Add a field to determine whether or not the plan has passed based on the current fetch date 
-        DF_ALL_ROSTERS['future_plan'] = 'False'
+        # Process dates, and add a field to determine whether or not the plan has passed based on the current fetch date 
+        DF_ALL_ROSTERS = normalizePlanDates(DF_ALL_ROSTERS, today = date.today())
 
 
-        # Get the current rundate and format it
-        today = datetime.strftime(date.today(), f'%Y-%m-%d')
-        # Process dates 
-        for i in tqdm(range(len(DF_ALL_ROSTERS.index)), desc = 'Processing Service Plan Dates'):
-            old_format = f'%B %d, %Y'
-            new_format = f'%Y-%m-%d'
+        # Sort the columns, then return them 
+        DF_ALL_ROSTERS.sort_values(by = ['plan_date', 'servicetype_name', 'team_name', 'person_id', 'status'])
+
+        return DF_ALL_ROSTERS
 
-            date_value = DF_ALL_ROSTERS['plan_date'].astype(str).values[i]
 
-            if '&' in date_value:
-                broken = date_value.split(' ')
-                broken_date_value = broken[0] + ' ' + broken[1][0:2] + ', ' + broken[len(broken)-1][0:4]
-                old_string = datetime.strptime(broken_date_value, old_format)
 
+class AsyncExporter(Exporter):
+    """
+    Exporter whose fetches run on a single asyncio event loop through aiohttp.
+
+    The loop lives in a background thread for the lifetime of the exporter, so parseJSON and the
+    generators keep the same synchronous API as Exporter, while every N+1 fan-out in parseJSONMany
+    keeps up to max_in_flight requests open at once without a thread per request. Incremental syncs, snapshots
+    and the response cache work as they do on Exporter.
+    """
+    def __init__(self, api_app_id: str, api_secret: str, max_in_flight: int = 100, pool_size: int = 10, keep_alive: bool = True, limiter: RateLimiter = None, per_page: int = MAX_PER_PAGE, parallel_pages: bool = True, sync_store: SyncStore = None, snapshot_store: SnapshotStore = None, response_cache: ResponseCache = None, api_root: str = None):
+        if aiohttp is None:
+            raise ModuleNotFoundError("AsyncExporter requires 'aiohttp'. Consult 'requirements.txt'.")
+        super().__init__(api_app_id, api_secret, pool_size = pool_size, keep_alive = keep_alive, limiter = limiter, per_page = per_page, parallel_pages = parallel_pages, 
+                         sync_store = sync_store, snapshot_store = snapshot_store, response_cache = response_cache, api_root = api_root)
+        self.max_in_flight = max_in_flight
+        self.async_auth = aiohttp.BasicAuth(api_app_id, api_secret)
+
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target = self.loop.run_forever, daemon = True).start()
+        # The aiohttp session and semaphore must be created on the loop that uses them
+        self.http, self.in_flight = self.run(self._openSession(keep_alive))
+
+    async def _openSession(self, keep_alive: bool) -> tuple:
+        # Honour REQUESTS_CA_BUNDLE as the requests-based Exporter does
+        ca_bundle = os.environ.get('REQUESTS_CA_BUNDLE')
+        ssl_context = ssl.create_default_context(cafile = ca_bundle) if ca_bundle else True
+        connector = aiohttp.TCPConnector(limit = self.max_in_flight, force_close = not keep_alive, ssl = ssl_context)
+        return aiohttp.ClientSession(connector = connector), asyncio.Semaphore(self.max_in_flight)
+
+    def run(self, coroutine: object) -> object:
+        """
+        Run a coroutine on the exporter's event loop and block until it returns.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self) -> None:
+        self.run(self.http.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        super().close()
+
+
+    async def fetchPageAsync(self, url: str) -> dict:
+        try:
+            async with self.in_flight:
+                return await safeGETAsync(url = self.routeURL(url), auth = self.async_auth, session = self.http, limiter = self.limiter, cache = self.response_cache, cache_key = url)
+        except Exception:
+            print(f'Error fetching .json for {url}. Returning records fetched so far.')
+            return None
+
+    async def fetchPagesAsync(self, url: str) -> PageAccumulator:
+        if self.isIncremental(url):
+            fetch_url, snapshot, started = self.beginIncremental(url)
+            return self.finishIncremental(url, snapshot, await self.fetchAllPagesAsync(fetch_url), started)
+        return await self.fetchAllPagesAsync(url)
+
+    async def fetchAllPagesAsync(self, url: str) -> PageAccumulator:
+        pages = PageAccumulator()
+        first_url = url
+        while True:
+            url = withPageSize(url, self.per_page)
+            payload = await self.fetchPageAsync(url)
+            if payload is None:
+                pages.complete = False
+                break
+
+            pages.addPage(payload)
+
+            # Try to see if a next page exists; if it doesn't, break the loop.
+            next_url = nextPageURL(payload)
+            if next_url is None:
+                break
+
+            offset_urls = remainingOffsetURLs(url, payload) if self.parallel_pages else []
+            if offset_urls:
+                for payload in await asyncio.gather(*[self.fetchPageAsync(offset_url) for offset_url in offset_urls]):
+                    if payload is not None:
+                        pages.addPage(payload)
+                    else:
+                        pages.complete = False
+                break
+            url = next_url
+
+        self.logPages(first_url, pages)
+        return pages
+
+    async def parseJSONIncludedAsync(self, url: str) -> tuple:
+        """
+        Async form of parseJSONIncluded, sharing the same frame cache.
+        """
+        future, owner = self.claimFrames(url)
+        if owner:
+            try:
+                pages = await self.fetchPagesAsync(url)
+            except BaseException as e:
+                self.settleFrames(url, future, error = e)
             else:
-                old_string = datetime.strptime(date_value, old_format)
+                self.settleFrames(url, future, pages)
+        # The fetch may be in flight on another thread; wait for it without blocking the loop
+        return shareFrames(await asyncio.wrap_future(future))
 
-            plan_date = datetime.strftime(old_string, new_format)
-            DF_ALL_ROSTERS['plan_date'].values[i] = plan_date
+    async def parseJSONAsync(self, url: str) -> object:
+        return (await self.parseJSONIncludedAsync(url))[0]
 
-            # Check if the plan is in the past or in the future
-            if datetime.strptime(plan_date, new_format) >= datetime.strptime(today, new_format):
-                DF_ALL_ROSTERS['future_plan'].values[i] = 'True'
+    async def parseJSONManyAsync(self, urls: list[str], desc: str = None, included: bool = False) -> list:
+        pbar = tqdm(total = len(urls), desc = desc)
 
+        async def fetch(url: str) -> object:
+            frames = await self.parseJSONIncludedAsync(url)
+            pbar.update(1)
+            return frames if included else frames[0]
 
-        # Sort the columns, then return them 
-        DF_ALL_ROSTERS.sort_values(by = ['plan_date', 'servicetype_name', 'team_name', 'person_id', 'status'])
+        # gather() returns results in the order of urls
+        frames = await asyncio.gather(*[fetch(url) for url in urls])
+        pbar.close()
+        return list(frames)
 
-        return DF_ALL_ROSTERS
+    def fetchPages(self, url: str) -> PageAccumulator:
+        return self.run(self.fetchPagesAsync(url))
 
+    def parseJSONMany(self, urls: list[str], desc: str = None, included: bool = False) -> list:
+        """
+        Fetch several endpoints concurrently on the event loop.
 
+        Frames are returned in the same order as urls, regardless of which request finishes first.
+        """
+        return self.run(self.parseJSONManyAsync(urls, desc = desc, included = included))
 
 
 
+class SnapshotExporter(Exporter):
+    """
+    Exporter that replays the raw endpoint frames of a SnapshotStore run instead of calling the API,
+    so the generators' join and transform stages can be re-run offline.
+    """
+    def __init__(self, snapshot_store: SnapshotStore, max_workers: int = 8):
+        super().__init__(api_app_id = '', api_secret = '', max_workers = max_workers)
+        self.replay_store = snapshot_store
 
+    def parseJSONIncluded(self, url: str) -> tuple:
+        return self.replay_store.frames(url)
 
 
 
 
 
-#####----- PUSHING DATA TO GOOGLE SHEET -----#####
 
-# Load scopes and service account information from api key
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets',
-           'https://www.googleapis.com/auth/drive']
-SERVICE_ACCOUNT_JSON = f'/Users/jacealloway/Desktop/python/pco_access/apikey/service_account.json'
-SECRET = np.loadtxt(f'/Users/jacealloway/Desktop/python/pco_access/apikey/keys.txt', dtype = str)
-SPREADSHEET_ID = f"{SECRET[2]}" 
-# Generate the API push engine 
-_UPLOAD_ = GoogleAPIPush(SCOPES = SCOPES, SERVICE_ACCOUNT_JSON = SERVICE_ACCOUNT_JSON, SPREADSHEET_ID = SPREADSHEET_ID)
-
-
-
-print(f"----- Beginning PCO API fetch at {datetime.today()} -----")
-start_time = time.time()
-# GET ALL DATA
-_ENGINE_ = Exporter(api_app_id = API_APP_ID, api_secret = API_SECRET)
-# Extract workflow data
-DF_WFS = _ENGINE_.workflowDFGenerator()
-# Extract New People and everything else
-DF_NEW_PEOPLE = DF_WFS[DF_WFS['workflow_name'].str.contains('NEW', na = False)] # Filter in new people
-DF_WORKFLOWS = DF_WFS[~DF_WFS['workflow_name'].str.contains('NEW', na = False)] # Filter out new people 
-dataframeCycle(dataframe = DF_NEW_PEOPLE, upload_engine = _UPLOAD_, sheet_name = 'newpeople')
-dataframeCycle(dataframe = DF_WORKFLOWS, upload_engine = _UPLOAD_, sheet_name = 'workflows')
-# Extract team roster data
-DF_ROSTERS = _ENGINE_.rosterDFGenerator()
-dataframeCycle(dataframe = DF_ROSTERS, upload_engine = _UPLOAD_, sheet_name = 'planrosters')
-# Extract group data 
-DF_GROUPS = _ENGINE_.groupDFGenerator()
-dataframeCycle(dataframe = DF_GROUPS, upload_engine = _UPLOAD_, sheet_name = 'groups')
-end_time = time.time()
-elapsed = end_time - start_time
-
-print(f"API fetched and processed in {elapsed:.2f} seconds / {(elapsed/60):.2f} minutes.")
 
 
 
+
+#####----- PIPELINES -----#####
+
+def loadKeys(keys_file: str = KEYS_FILE) -> tuple:
+    """
+    Load the planning centre API app id and secret, and the spreadsheet id, from the keys file.
+    """
+    SECRET = np.loadtxt(keys_file, dtype = str)
+    return f"{SECRET[0]}", f"{SECRET[1]}", f"{SECRET[2]}" if len(SECRET) > 2 else None
+
+
+def workflowsPipeline(exporter: Exporter) -> dict:
+    # Extract workflow data, then split New People from everything else
+    DF_WFS = exporter.workflowDFGenerator()
+    return {'newpeople' : DF_WFS[DF_WFS['workflow_name'].str.contains('NEW', na = False)], 
+            'workflows' : DF_WFS[~DF_WFS['workflow_name'].str.contains('NEW', na = False)]}
+
+
+def rostersPipeline(exporter: Exporter) -> dict:
+    return {'planrosters' : exporter.rosterDFGenerator()}
+
+
+def groupsPipeline(exporter: Exporter) -> dict:
+    return {'groups' : exporter.groupDFGenerator()}
+
+
+def hostingBirthdaysPipeline(exporter: Exporter) -> dict:
+    # Imported here, as the birthday job imports this module itself
+    from HOSTING_BIRTHDAYS_DT_ETL import getHostingBirthdays
+    return {'dt_hosting_birthdays' : getHostingBirthdays(exporter)}
+
+
+# Each pipeline returns its dataframes keyed by the sheet they are pushed to
+PIPELINES = {'workflows' : workflowsPipeline, 
+             'rosters' : rostersPipeline, 
+             'groups' : groupsPipeline, 
+             'hosting-birthdays' : hostingBirthdaysPipeline}
+DEFAULT_PIPELINES = ['workflows', 'rosters', 'groups']
+
+# Stable id columns of each sheet, so that only changed rows are pushed (see GoogleAPIPush.pushMany)
+SHEET_KEYS = {'newpeople' : ['card_id', 'history_step_id'], 
+              'workflows' : ['card_id', 'history_step_id'], 
+              'planrosters' : ['person_id', 'servicetype_name', 'team_name', 'plan_date'], 
+              'groups' : ['group_id', 'event_id', 'person_id']}
+
+
+def runPipeline(pipeline: str, exporter: Exporter) -> dict:
+    """
+    Run one pipeline as a frame consumer, so the shared frames it fetched are let go once no running pipeline needs them.
+    """
+    with exporter.consumingFrames():
+        return PIPELINES[pipeline](exporter)
+
+
+
+def runStages(stages: dict, max_workers: int = None) -> dict:
+    """
+    Run a DAG of stages concurrently, each one as soon as every stage it depends on has finished.
+
+    Args:
+        stages: Stage functions and the names of the stages they depend on, as {name : (function, [dependencies])}.
+                A function is called with the results of its dependencies, in that order (dict)
+        max_workers: Most stages running at once; by default all of them (int)
+
+    Returns:
+        The result of each stage keyed by name (dict). When a stage fails, the stages depending on it are skipped
+        while the others carry on, and the first error is raised once nothing is left running.
+    """
+    for name, (_, dependencies) in stages.items():
+        unknown = [dependency for dependency in dependencies if dependency not in stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s) {', '.join(unknown)}.")
+
+    results, errors, timeline = {}, {}, {}
+    waiting = dict(stages)
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers = max_workers or max(len(stages), 1)) as executor:
+        running = {}
+        while waiting or running:
+            ready = True
+            while ready:
+                ready = False
+                for name, (function, dependencies) in list(waiting.items()):
+                    if any(dependency in errors for dependency in dependencies):
+                        # Skipped, so that its own dependents are skipped as well
+                        errors[name] = None
+                    elif all(dependency in results for dependency in dependencies):
+                        timeline[name] = [time.time() - start_time, None]
+                        running[executor.submit(function, *[results[dependency] for dependency in dependencies])] = name
+                    else:
+                        continue
+                    del waiting[name]
+                    ready = True
+            if not running:
+                if waiting:
+                    raise ValueError(f"Stages {', '.join(waiting)} have cyclic dependencies.")
+                break
+
+            done, _ = wait(running, return_when = FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                timeline[name][1] = time.time() - start_time
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+                    print(f"Stage '{name}' failed: {e!r}")
+
+    for name, (started, finished) in sorted(timeline.items(), key = lambda item: item[1][0]):
+        print(f"Stage '{name}' ran from {started:.2f}s to {finished:.2f}s ({finished - started:.2f} seconds).")
+    skipped = [name for name, error in errors.items() if error is None]
+    if skipped:
+        print(f"Skipped stages after a failure: {', '.join(skipped)}.")
+    failures = [error for error in errors.values() if error is not None]
+    if failures:
+        raise failures[0]
+    return results
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description = 'Fetch Planning Center data and push it to the Google Sheets dashboard.')
+    parser.add_argument('pipelines', nargs = '*', metavar = 'PIPELINE', 
+                        help = f"Pipelines to run, from {', '.join(PIPELINES)} (default: {' '.join(DEFAULT_PIPELINES)}).")
+    parser.add_argument('--keys', default = KEYS_FILE, help = 'File with the PCO app id, PCO secret and spreadsheet id.')
+    parser.add_argument('--service-account', default = SERVICE_ACCOUNT_FILE, help = 'Google service account JSON file.')
+    parser.add_argument('--replay', metavar = 'RUN_ID', help = "Re-run from a Parquet snapshot run ('latest' for the newest) instead of the API.")
+    parser.add_argument('--dry-run', action = 'store_true', help = 'Build the dataframes without pushing them to Google Sheets.')
+    parser.add_argument('--full', action = 'store_true', 
+                        help = "Fetch every endpoint in full instead of only the changes since the last sync, and rebuild 'syncstate' from it.")
+    parser.add_argument('--api-root', metavar = 'URL', 
+                        help = 'Send API requests to another server, e.g. a local pco_mock_server, as a dry run. Local sync, snapshot and cache state is not used.')
+    args = parser.parse_args(argv)
+    # argparse cannot combine choices with an empty nargs='*' positional, so the names are checked here
+    unknown = [pipeline for pipeline in args.pipelines if pipeline not in PIPELINES]
+    if unknown:
+        parser.error(f"unknown pipeline(s) {', '.join(unknown)}; choose from {', '.join(PIPELINES)}")
+    pipelines = list(dict.fromkeys(args.pipelines or DEFAULT_PIPELINES))
+
+    warnings.simplefilter(action='ignore', category=FutureWarning)
+    pd.set_option('display.max_rows', None)
+    pd.set_option('display.max_columns', None)
+
+    # A run against another server (e.g. a pco_mock_server) is always a dry run, so its data never reaches the dashboard
+    dry_run = args.dry_run or args.api_root is not None
+    if dry_run and not args.dry_run:
+        print('Dry run: --api-root is set, so nothing is pushed to Google Sheets.')
+
+    # Try to load planning centre API URL
+    if args.replay is not None and dry_run:
+        # A replay makes no API requests, and a dry run has no spreadsheet to push to, so no keys are needed
+        API_APP_ID, API_SECRET, SPREADSHEET_ID = None, None, None
+    else:
+        try:
+            API_APP_ID, API_SECRET, SPREADSHEET_ID = loadKeys(args.keys)
+        except FileNotFoundError:
+            if args.api_root is None:
+                print('API Secret KEY not found. Terminating.')
+                sys.exit(1)
+            # A mock server does not check credentials
+            API_APP_ID, API_SECRET, SPREADSHEET_ID = 'mock', 'mock', None
+
+
+    print(f"----- Beginning PCO API fetch at {datetime.today()} -----")
+    start_time = time.time()
+    if args.replay is not None:
+        _ENGINE_ = SnapshotExporter(SnapshotStore('snapshots', run_id = args.replay))
+    elif args.api_root is not None:
+        # Kept apart from the local stores, so a run against another server never mixes into the real sync state
+        _ENGINE_ = Exporter(api_app_id = API_APP_ID, api_secret = API_SECRET, api_root = args.api_root)
+    else:
+        # Cards, activities, events and attendances are synced incrementally against the local 'syncstate' store (in full with --full),
+        # and every raw endpoint frame is snapshotted to 'snapshots' for offline re-runs (when pyarrow is installed).
+        # Pages are revalidated against 'responsecache', so unchanged ones are not downloaded again.
+        _ENGINE_ = Exporter(api_app_id = API_APP_ID, api_secret = API_SECRET, sync_store = SyncStore('syncstate', force_full = args.full), 
+                            snapshot_store = SnapshotStore('snapshots') if pyarrow is not None else None, 
+                            response_cache = ResponseCache('responsecache'))
+
+    # Sheets with stable id columns are diffed against the last push kept in 'sheetstate', and only changed rows are sent
+    _UPLOAD_ = None
+    if not dry_run:
+        _UPLOAD_ = GoogleAPIPush(SCOPES = SCOPES, SERVICE_ACCOUNT_JSON = args.service_account, SPREADSHEET_ID = SPREADSHEET_ID, 
+                                 sheet_state = SheetStateStore('sheetstate'))
+
+    # GET ALL DATA
+    # The pipelines are fetched at the same time; sharing one exporter keeps them within one PCO rate budget
+    # and lets them share endpoints they both need. Each pipeline's sheets are pushed as soon as its frames are ready.
+    stages = {}
+    for pipeline in pipelines:
+        stages[pipeline] = (lambda pipeline = pipeline: runPipeline(pipeline, _ENGINE_), [])
+        if _UPLOAD_ is not None:
+            stages[f'push {pipeline}'] = (lambda DATAFRAMES: dataframesCycle(dataframes = DATAFRAMES, upload_engine = _UPLOAD_, key_columns = SHEET_KEYS), 
+                                          [pipeline])
+    runStages(stages)
+    end_time = time.time()
+    elapsed = end_time - start_time
+
+    print(f"API fetched and processed in {elapsed:.2f} seconds / {(elapsed/60):.2f} minutes.")
+    print(f"Rate limiter: {_ENGINE_.limiter.stats()}")
+    print(_ENGINE_.pageReport().to_string())
+    if _ENGINE_.response_cache is not None:
+        print(f"Response cache: {_ENGINE_.response_cache.stats()}")
+        print(_ENGINE_.response_cache.report().to_string())
+    _ENGINE_.close()
+
+
+
+if __name__ == "__main__":
+    main()
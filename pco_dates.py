@@ -0,0 +1,156 @@
+# Import packages
+try:
+    import numpy as np
+    import pandas as pd
+    from datetime import datetime, timedelta
+    from functools import lru_cache
+except ModuleNotFoundError:
+    print("Ensure all packages are installed. Consult 'requirements.txt'.")
+
+
+
+# Scalar helpers are memoized: the same handful of dates recurs across thousands of rows
+DATE_CACHE_SIZE = 65536
+
+
+
+#####----- SCALAR HELPERS -----#####
+@lru_cache(maxsize = DATE_CACHE_SIZE)
+def weekEndSunday(input_date: str) -> str:
+    """
+    Compute the week-end leading Sunday based off a given time string.
+
+    Input must be of format '%Y-%m-%d'
+    """
+    format = f'%Y-%m-%d'
+
+    input_datetime = datetime.strptime(input_date, format)
+    output_date = input_datetime + timedelta(days = 7 - input_datetime.isoweekday())
+    new_string = datetime.strftime(output_date, format)
+
+    return new_string
+
+
+@lru_cache(maxsize = DATE_CACHE_SIZE)
+def reformatTimestring(time: str) -> str:
+    old_format = f'%Y-%m-%dT%H:%M:%SZ'
+    new_format = f'%Y-%m-%d'
+
+    old_string = datetime.strptime(time, old_format)
+    new_string = datetime.strftime(old_string, new_format)
+
+    return new_string
+
+
+@lru_cache(maxsize = DATE_CACHE_SIZE)
+def parseDate(input_date: str) -> datetime:
+    return datetime.strptime(input_date, f'%Y-%m-%d')
+
+
+def getTimeGap(time1: str, time2: str) -> str:
+    """
+    Compute the elapsed time between two inputs.
+
+    Args:
+        time1: Input of format '%Y-%m-%d' (str)
+        time2: Input of format '%Y-%m-%d' (str)
+
+    Returns:
+        Number of days and hours between inputs (str).
+    """
+    dt = parseDate(time1) - parseDate(time2)
+    gap = str(abs(dt.days))
+
+    return gap
+
+
+
+#####----- COLUMN HELPERS -----#####
+def parseTimestrings(times: object) -> object:
+    """
+    Vectorized reformatTimestring: parse '%Y-%m-%dT%H:%M:%SZ' strings to datetimes at midnight (NaT where missing or unparseable).
+
+    Each distinct string is parsed once, since joined tables repeat the same timestamps across many rows.
+    """
+    codes, uniques = pd.factorize(pd.Series(times, dtype = object))
+    # The ISO8601 fast path reads the trailing 'Z' as UTC; drop the zone again so dates are kept as written
+    parsed = pd.to_datetime(pd.Series(uniques, dtype = object), format = 'ISO8601', errors = 'coerce', utc = True)
+    parsed = parsed.dt.tz_localize(None).dt.normalize().values.astype('datetime64[ns]')
+    dates = np.full(len(codes), np.datetime64('NaT'), dtype = 'datetime64[ns]')
+    dates[codes >= 0] = parsed[codes[codes >= 0]]
+    return pd.Series(dates)
+
+
+def parseDates(dates: object) -> object:
+    """
+    Parse '%Y-%m-%d' strings to datetimes (NaT where missing or unparseable).
+    """
+    return pd.Series(pd.to_datetime(pd.Series(dates, dtype = object), format = f'%Y-%m-%d', errors = 'coerce').values)
+
+
+def weekEndSundays(dates: object) -> object:
+    """
+    Vectorized weekEndSunday on a datetime series: the Sunday ending each date's week (Sundays map to themselves).
+    """
+    return dates + pd.to_timedelta(6 - dates.dt.dayofweek, unit = 'D')
+
+
+def dayGaps(dates1: object, dates2: object) -> object:
+    """
+    Vectorized getTimeGap on datetime series (or a single date against a series):
+    the absolute number of days between them, as strings.
+    """
+    gaps = (dates1 - dates2).dt.days.abs()
+    strings = gaps.fillna(0).to_numpy(dtype = np.int64).astype(str).astype(object)
+    strings[gaps.isna().values] = ''
+    return pd.Series(strings, index = gaps.index)
+
+
+def dateStrings(dates: object) -> object:
+    """
+    Format a datetime series as '%Y-%m-%d' strings, with '' for missing dates.
+    """
+    strings = np.datetime_as_string(dates.values.astype('datetime64[D]'), unit = 'D').astype(object)
+    strings[dates.isna().values] = ''
+    return pd.Series(strings, index = dates.index)
+
+
+def parsePlanDates(plan_dates: object) -> object:
+    """
+    Parse PCO service plan 'dates' strings ('March 3, 2024', or 'March 3 & 4, 2024' for multi-day plans) to the first date of the plan.
+
+    Each distinct string is parsed once, since a roster repeats the same few dozen plan dates across thousands of rows.
+    """
+    codes, uniques = pd.factorize(pd.Series(plan_dates, dtype = object).astype(str))
+    uniques = pd.Series(uniques, dtype = object)
+
+    # Keep the part before '&'; it only carries the year itself when the plan spans two years
+    first = uniques.str.split('&').str[0].str.strip().str.rstrip(',')
+    year = uniques.str.extract(r'(\d{4})\D*$', expand = False)
+    first = first.where(first.str.contains(r'\d{4}$'), first + ', ' + year)
+
+    parsed = pd.to_datetime(first, format = f'%B %d, %Y').values
+    return pd.Series(parsed[codes])
+
+
+
+#####----- ARRAY FORMS OF THE SCALAR HELPERS -----#####
+def reformatTimestrings(times: object) -> object:
+    """
+    Array form of reformatTimestring: '%Y-%m-%dT%H:%M:%SZ' strings in, '%Y-%m-%d' strings out ('' where unparseable).
+    """
+    return dateStrings(parseTimestrings(times)).values
+
+
+def weekEndSundayStrings(dates: object) -> object:
+    """
+    Array form of weekEndSunday: '%Y-%m-%d' strings in, week-end Sunday strings out ('' where unparseable).
+    """
+    return dateStrings(weekEndSundays(parseDates(dates))).values
+
+
+def timeGaps(dates1: object, dates2: object) -> object:
+    """
+    Array form of getTimeGap: the absolute number of days between two arrays of '%Y-%m-%d' strings, as strings ('' where unparseable).
+    """
+    return dayGaps(parseDates(dates1), parseDates(dates2)).values
@@ -0,0 +1,1387 @@
+
+# Import packages
+try:
+    import PCO_ETL
+    from PCO_ETL import Exporter, AsyncExporter, RateLimiter, GoogleAPIPush
+    import pco_dates
+    from pco_mock_server import MockPCOServer, syntheticRecords, syntheticPCODataset
+    import numpy as np
+    import pandas as pd
+    import time
+    from datetime import date, datetime, timedelta
+    import json
+    import os
+    import ssl
+    import subprocess
+    import tempfile
+    import threading
+    import re
+    import io
+    import sys
+    import platform
+    import resource
+    import multiprocessing
+    from contextlib import redirect_stderr
+    from concurrent.futures import ProcessPoolExecutor
+    from urllib.parse import urlsplit, unquote
+    from contextlib import contextmanager
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ModuleNotFoundError:
+    print("Ensure all packages are installed. Consult 'requirements.txt'.")
+
+# Optional Google auth package, only needed for the Sheets push benchmarks
+try:
+    from google.auth.credentials import AnonymousCredentials
+except ModuleNotFoundError:
+    AnonymousCredentials = None
+
+
+
+# Canned pages are served from this fake base URL; nothing here touches the live API
+CANNED_BASE = 'https://canned.invalid/people/v2/people'
+PER_PAGE = 100
+
+
+
+class CannedResponse():
+    """
+    Minimal stand-in for requests.Response holding a canned JSON page.
+    """
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.status_code = 200
+        self.headers = {}
+
+    def json(self) -> dict:
+        return self.payload
+
+
+def cannedPersonRecord(person_id: int) -> dict:
+    """
+    Build a single PCO-shaped person record.
+    """
+    return {
+        'type' : 'Person',
+        'id' : str(person_id),
+        'attributes' : {
+            'name' : f'Person {person_id}',
+            'child' : False,
+            'gender' : 'M' if person_id % 2 else 'F',
+            'created_at' : '2024-01-07T12:00:00Z'
+        },
+        'relationships' : {
+            'primary_campus' : {'data' : {'type' : 'Campus', 'id' : str(person_id % 5)}}
+        }
+    }
+
+
+def cannedPages(record_count: int, per_page: int = PER_PAGE) -> dict:
+    """
+    Build a url -> payload mapping of paginated JSON:API pages holding record_count records.
+    """
+    pages = {}
+    offsets = range(0, max(record_count, 1), per_page)
+    for offset in offsets:
+        # Mirror PCO's links, which carry per_page and offset
+        url = f'{CANNED_BASE}?per_page={per_page}' if offset == 0 else f'{CANNED_BASE}?per_page={per_page}&offset={offset}'
+        payload = {
+            'data' : [cannedPersonRecord(i) for i in range(offset, min(offset + per_page, record_count))],
+            'links' : {},
+            'meta' : {'total_count' : record_count}
+        }
+        if offset + per_page < record_count:
+            payload['links']['next'] = f'{CANNED_BASE}?per_page={per_page}&offset={offset + per_page}'
+        pages[url] = payload
+    return pages
+
+
+def legacyParseJSON(pages: dict, url: str) -> object:
+    """
+    The previous per-record pd.concat accumulation, kept only as a benchmark baseline.
+    """
+    df = pd.DataFrame()
+    while True:
+        response_flattened = pd.json_normalize(pages[url])
+        for i in response_flattened["data"]:
+            df = pd.concat([df, pd.json_normalize(i)], ignore_index = True)
+        try:
+            url = response_flattened["links.next"].values[0]
+        except KeyError:
+            break
+    return df
+
+
+def benchmarkPageAccumulation(record_counts: list[int] = [500, 1000, 2000, 5000, 20000], legacy_limit: int = 5000) -> object:
+    """
+    Time Exporter.parseJSON against canned JSON pages for increasing record counts.
+
+    The legacy per-record concat is only timed up to legacy_limit records, since it grows quadratically.
+    """
+    original_safeGET = PCO_ETL.safeGET
+
+    results = []
+    try:
+        for record_count in record_counts:
+            pages = cannedPages(record_count)
+            PCO_ETL.safeGET = lambda url, auth, **kwargs: CannedResponse(pages[url])
+
+            # A new exporter per count, since every count is served from the same URL and the frame cache would return the last one
+            ENGINE = Exporter(api_app_id = 'canned', api_secret = 'canned')
+            start_time = time.perf_counter()
+            df = ENGINE.parseJSON(CANNED_BASE)
+            accumulator_seconds = time.perf_counter() - start_time
+            ENGINE.close()
+
+            legacy_seconds = float('nan')
+            if record_count <= legacy_limit:
+                start_time = time.perf_counter()
+                legacy_df = legacyParseJSON(pages, f'{CANNED_BASE}?per_page={PER_PAGE}')
+                legacy_seconds = time.perf_counter() - start_time
+                assert legacy_df.shape == df.shape
+
+            results.append({'records' : record_count,
+                            'pages' : len(pages),
+                            'accumulator_seconds' : round(accumulator_seconds, 4),
+                            'legacy_concat_seconds' : round(legacy_seconds, 4)})
+    finally:
+        PCO_ETL.safeGET = original_safeGET
+
+    return pd.DataFrame(results)
+
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves the same small JSON:API page for every GET, over HTTP/1.1 so connections can be kept alive.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    body = json.dumps({'data' : [cannedPersonRecord(i) for i in range(25)], 'links' : {}}).encode()
+    # Simulated server-side latency per request, in seconds
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def selfSignedCertificate(directory: str) -> tuple:
+    """
+    Generate a throwaway self-signed certificate for 127.0.0.1 with the openssl CLI.
+    """
+    cert_path = os.path.join(directory, 'cert.pem')
+    key_path = os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1',
+                    '-keyout', key_path, '-out', cert_path], check = True, capture_output = True)
+    return cert_path, key_path
+
+
+def startStandInServer(cert_path: str, key_path: str, latency: float = 0.0, handler: type = StandInHandler) -> object:
+    """
+    Start a local HTTPS stand-in server on a free port in a background thread.
+    """
+    handler = type('LatentStandInHandler', (handler,), {'latency' : latency})
+    # A deep listen backlog so hundreds of concurrent connections are not dropped at accept()
+    server_class = type('StandInServer', (ThreadingHTTPServer,), {'request_queue_size' : 1024, 'daemon_threads' : True})
+    server = server_class(('127.0.0.1', 0), handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    # Handshake lazily in each handler thread rather than serially in the accept loop
+    server.socket = context.wrap_socket(server.socket, server_side = True, do_handshake_on_connect = False)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    return server
+
+
+@contextmanager
+def standInHTTPS(latency: float = 0.0, handler: type = StandInHandler):
+    """
+    Run the HTTPS stand-in server for the duration of the block and yield its base URL.
+    The throwaway certificate is trusted through REQUESTS_CA_BUNDLE meanwhile.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = selfSignedCertificate(directory)
+        server = startStandInServer(cert_path, key_path, latency = latency, handler = handler)
+
+        previous_bundle = os.environ.get('REQUESTS_CA_BUNDLE')
+        os.environ['REQUESTS_CA_BUNDLE'] = cert_path
+        try:
+            yield f'https://127.0.0.1:{server.server_address[1]}'
+        finally:
+            server.shutdown()
+            if previous_bundle is None:
+                os.environ.pop('REQUESTS_CA_BUNDLE', None)
+            else:
+                os.environ['REQUESTS_CA_BUNDLE'] = previous_bundle
+
+
+def benchmarkPooledSession(request_count: int = 300) -> object:
+    """
+    Measure requests/sec of safeGET against a local HTTPS stand-in server, with and without the pooled session.
+    """
+    results = []
+    with standInHTTPS() as base_url:
+        url = base_url + '/people/v2/people'
+        for mode in ('bare requests.get', 'pooled session'):
+            ENGINE = Exporter(api_app_id = 'stand-in', api_secret = 'stand-in')
+            session = ENGINE.session if mode == 'pooled session' else None
+
+            start_time = time.perf_counter()
+            for _ in range(request_count):
+                PCO_ETL.safeGET(url = url, auth = ENGINE.auth, session = session)
+            elapsed = time.perf_counter() - start_time
+
+            ENGINE.close()
+            results.append({'mode' : mode,
+                            'requests' : request_count,
+                            'seconds' : round(elapsed, 3),
+                            'requests_per_second' : round(request_count / elapsed, 1)})
+
+    return pd.DataFrame(results)
+
+
+def benchmarkFanOut(request_count: int = 500, latency: float = 0.05) -> object:
+    """
+    Time an N+1 fan-out through Exporter (thread pool) and AsyncExporter (one event loop)
+    against the HTTPS stand-in with simulated latency. The rate budget is lifted so only the fetch layer is measured.
+    """
+    results = []
+    with standInHTTPS(latency = latency) as base_url:
+        urls = [base_url + f'/people/v2/people/{i}/workflow_cards/{i}/activities' for i in range(request_count)]
+        engines = {'Exporter (threads)' : lambda: Exporter(api_app_id = 'stand-in', api_secret = 'stand-in', limiter = RateLimiter(limit = 10**6, period = 1)),
+                   'AsyncExporter (event loop)' : lambda: AsyncExporter(api_app_id = 'stand-in', api_secret = 'stand-in', limiter = RateLimiter(limit = 10**6, period = 1))}
+        for mode, build in engines.items():
+            ENGINE = build()
+            start_time = time.perf_counter()
+            frames = ENGINE.parseJSONMany(urls, desc = mode)
+            elapsed = time.perf_counter() - start_time
+            ENGINE.close()
+
+            results.append({'mode' : mode,
+                            'requests' : request_count,
+                            'records' : sum(len(df) for df in frames),
+                            'seconds' : round(elapsed, 3),
+                            'requests_per_second' : round(request_count / elapsed, 1)})
+
+    return pd.DataFrame(results)
+
+
+class ETagStandInHandler(StandInHandler):
+    """
+    Serves a 100-record page per path with an 'ETag' of the path's current version, answering a matching
+    'If-None-Match' with an empty 304. Bumping versions[path] makes that endpoint change. Body bytes sent are counted.
+    """
+    versions = {}
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        path = urlsplit(self.path).path
+        with self.lock:
+            version = self.versions.get(path, 0)
+        etag = f'"{path}-{version}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        records = [dict(cannedPersonRecord(i), type = f'{path}-{version}') for i in range(100)]
+        body = json.dumps({'data' : records, 'links' : {}}).encode()
+        with self.lock:
+            ETagStandInHandler.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def benchmarkResponseCache(endpoint_count: int = 20, changed_count: int = 2, latency: float = 0.02) -> object:
+    """
+    Fetch slow-changing endpoints on two 'nights' against the ETag stand-in, changing changed_count of them in between:
+    once without a cache and once with a ResponseCache in a temporary directory. Reports body bytes downloaded,
+    wall time and cache hit rate per night, and whether the frames match the uncached fetch.
+    """
+    results = []
+    handler = type('BenchmarkETagHandler', (ETagStandInHandler,), {'versions' : {}, 'lock' : threading.Lock()})
+    with standInHTTPS(latency = latency, handler = handler) as base_url, tempfile.TemporaryDirectory() as directory:
+        paths = [f'/services/v2/service_types/{i}/teams' for i in range(endpoint_count)]
+        urls = [base_url + path for path in paths]
+        for night in [1, 2]:
+            if night == 2:
+                for path in paths[:changed_count]:
+                    handler.versions[path] = 1
+            expected = None
+            for label, cache in [('no cache', None), ('ResponseCache', PCO_ETL.ResponseCache(os.path.join(directory, 'responsecache')))]:
+                ENGINE = Exporter(api_app_id = 'stand-in', api_secret = 'stand-in', limiter = RateLimiter(limit = 10**6, period = 1), response_cache = cache)
+                ETagStandInHandler.bytes_sent = 0
+                start_time = time.perf_counter()
+                frames = ENGINE.parseJSONMany(urls, desc = f'night {night}, {label}')
+                elapsed = time.perf_counter() - start_time
+                ENGINE.close()
+
+                expected = frames if expected is None else expected
+                results.append({'night' : night, 
+                                'fetch' : label, 
+                                'requests' : endpoint_count, 
+                                'bytes_downloaded' : ETagStandInHandler.bytes_sent, 
+                                'seconds' : round(elapsed, 3), 
+                                'hit_rate' : cache.stats()['hit_rate'] if cache is not None else 0.0, 
+                                'frames_match' : all(df.equals(expected_df) for df, expected_df in zip(frames, expected))})
+
+    return pd.DataFrame(results)
+
+
+def legacyWeekEndSunday(input_date: str) -> str:
+    """
+    The original uncached weekEndSunday (two strptime calls and an np.ceil per call), kept as a baseline.
+    """
+    format = f'%Y-%m-%d'
+    weekday = datetime.strptime(input_date, format).isoweekday()
+    output_date = datetime.strptime(input_date, format) + timedelta(days = int(7 - (np.ceil(weekday))  ))
+    return datetime.strftime(output_date.date(), format)
+
+
+def legacyReformatTimestring(time: str) -> str:
+    """
+    The original uncached reformatTimestring, kept as a baseline.
+    """
+    return datetime.strftime(datetime.strptime(time, f'%Y-%m-%dT%H:%M:%SZ'), f'%Y-%m-%d')
+
+
+def legacyGetTimeGap(time1: str, time2: str) -> str:
+    """
+    The original uncached getTimeGap, kept as a baseline.
+    """
+    format = f'%Y-%m-%d'
+    dt = datetime.strptime(time1, format) - datetime.strptime(time2, format)
+    return str(dt.days).replace('-', '')
+
+
+def benchmarkDateHelpers(call_count: int = 200000, distinct_dates: int = 500) -> object:
+    """
+    Time the original scalar date helpers, the memoized scalar forms in pco_dates and their array forms
+    over call_count inputs drawn from distinct_dates values, and check that all three agree.
+    """
+    rng = np.random.default_rng(0)
+    base = datetime(2023, 1, 1)
+    days = rng.integers(0, distinct_dates, call_count)
+    timestrings = [datetime.strftime(base + timedelta(days = int(day)), f'%Y-%m-%dT12:00:00Z') for day in days]
+    dates = [datetime.strftime(base + timedelta(days = int(day)), f'%Y-%m-%d') for day in days]
+    other_dates = dates[::-1]
+
+    helpers = [
+        ('reformatTimestring', lambda: [legacyReformatTimestring(t) for t in timestrings], 
+                               lambda: [pco_dates.reformatTimestring(t) for t in timestrings], 
+                               lambda: pco_dates.reformatTimestrings(timestrings)),
+        ('weekEndSunday', lambda: [legacyWeekEndSunday(d) for d in dates], 
+                          lambda: [pco_dates.weekEndSunday(d) for d in dates], 
+                          lambda: pco_dates.weekEndSundayStrings(dates)),
+        ('getTimeGap', lambda: [legacyGetTimeGap(d1, d2) for d1, d2 in zip(dates, other_dates)], 
+                       lambda: [pco_dates.getTimeGap(d1, d2) for d1, d2 in zip(dates, other_dates)], 
+                       lambda: pco_dates.timeGaps(dates, other_dates)),
+    ]
+
+    results = []
+    for name, legacy, cached, vectorized in helpers:
+        timings, outputs = {}, {}
+        for label, helper in [('legacy_scalar', legacy), ('cached_scalar', cached), ('array', vectorized)]:
+            start_time = time.perf_counter()
+            outputs[label] = list(helper())
+            timings[label] = time.perf_counter() - start_time
+
+        results.append({'helper' : name, 
+                        'calls' : call_count, 
+                        'legacy_scalar_seconds' : round(timings['legacy_scalar'], 3), 
+                        'cached_scalar_seconds' : round(timings['cached_scalar'], 3), 
+                        'array_seconds' : round(timings['array'], 3), 
+                        'outputs_match' : outputs['legacy_scalar'] == outputs['cached_scalar'] == outputs['array']})
+
+    return pd.DataFrame(results)
+
+
+
+# Columns written by the workflow timedelta stage, compared row for row
+WORKFLOW_TIMEDELTA_COLUMNS = ['card_created_at', 'current_day_initiated', 'current_initiated_week_end', 'current_days_at_step', 
+                              'history_day_initiated', 'history_initiated_week_end', 'history_day_completed', 'history_completed_week_end', 
+                              'history_days_at_step', 'days_in_workflow', 'card_complete_ind', 'current_step_name', 
+                              'current_workflow_name', 'current_workflow_campus_name']
+
+
+def syntheticWorkflowHistory(row_count: int, seed: int = 0) -> object:
+    """
+    Build a sorted workflow history frame shaped like DF_ALL_DATA just before the timedelta stage.
+    """
+    rng = np.random.default_rng(seed)
+    card_ids = np.sort(rng.integers(0, max(row_count // 4, 1), row_count)).astype(str)
+    base = datetime(2023, 1, 1)
+    def timestamps(days: object) -> list:
+        return [datetime.strftime(base + timedelta(days = int(day), seconds = int(second)), f'%Y-%m-%dT%H:%M:%SZ') 
+                for day, second in zip(days, rng.integers(0, 86400, row_count))]
+
+    created_days = rng.integers(0, 600, row_count)
+    DF = pd.DataFrame({
+        'stage' : rng.choice(['completed', 'ready', 'snoozed'], row_count),
+        'card_id' : card_ids,
+        'current_step_sequence' : rng.integers(0, 5, row_count).astype(float),
+        'card_created_at' : timestamps(created_days),
+        'moved_to_step_at' : timestamps(created_days + rng.integers(0, 120, row_count)),
+        'log_created_at' : timestamps(created_days + rng.integers(0, 120, row_count)),
+        'current_step_name' : rng.choice(['Step 1', 'Step 2', 'Step 3'], row_count).astype(object),
+        'current_workflow_name' : rng.choice(['NEW PEOPLE', 'BAPTISM'], row_count).astype(object),
+        'current_workflow_campus_name' : rng.choice(['Downtown', 'Midtown'], row_count).astype(object),
+        'history_workflow_name' : rng.choice(['NEW PEOPLE', 'BAPTISM'], row_count).astype(object),
+        'history_workflow_primary_campus' : rng.choice(['Downtown', 'Midtown'], row_count).astype(object),
+    })
+    for column, default in [('current_day_initiated', ''), ('current_initiated_week_end', ''), ('current_days_at_step', '0'), 
+                            ('history_day_initiated', ''), ('history_initiated_week_end', ''), ('history_day_completed', ''), 
+                            ('history_completed_week_end', ''), ('history_days_at_step', ''), ('days_in_workflow', '0'), ('card_complete_ind', 'False')]:
+        DF[column] = default
+    return DF.sort_values(by = ['card_id', 'log_created_at']).reset_index(drop = True)
+
+
+def legacyWorkflowTimedeltas(DF_ALL_DATA: object, today: str) -> object:
+    """
+    The previous per-row 'Computing workflow timedeltas' loop, kept only as a benchmark and equivalence baseline.
+    It writes into copied object arrays, since '.values[i] = ...' is read-only under pandas copy-on-write.
+    """
+    reformatTimestring, weekEndSunday, getTimeGap = legacyReformatTimestring, legacyWeekEndSunday, legacyGetTimeGap
+    values = {column : DF_ALL_DATA[column].to_numpy(dtype = object, copy = True) for column in DF_ALL_DATA.columns}
+
+    for i in range(len(DF_ALL_DATA.index)):
+        card_stage = values['stage'][i]
+        card_id = values['card_id'][i]
+        card_created_at = reformatTimestring(values['card_created_at'][i])
+        moved_to_step_at = reformatTimestring(values['moved_to_step_at'][i])
+        log_created_at = reformatTimestring(values['log_created_at'][i])
+        values['card_created_at'][i] = card_created_at
+
+        values['current_day_initiated'][i] = moved_to_step_at
+        values['current_initiated_week_end'][i] = weekEndSunday(moved_to_step_at)
+
+        if card_stage == 'completed':
+            values['days_in_workflow'][i] = getTimeGap(moved_to_step_at, card_created_at)
+            values['card_complete_ind'][i] = 'True'
+            values['current_step_name'][i] = 'Workflow Completed'
+            values['current_workflow_name'][i] = values['history_workflow_name'][i]
+            values['current_workflow_campus_name'][i] = values['history_workflow_primary_campus'][i]
+        elif card_stage in ('snoozed', 'ready'):
+            values['days_in_workflow'][i] = getTimeGap(today, card_created_at)
+            values['current_days_at_step'][i] = getTimeGap(today, moved_to_step_at)
+
+        if i == 0:
+            values['history_day_initiated'][i] = card_created_at
+            values['history_initiated_week_end'][i] = weekEndSunday(card_created_at)
+
+        if i == len(DF_ALL_DATA.index) - 1:
+            values['history_day_completed'][i] = log_created_at
+            values['history_completed_week_end'][i] = weekEndSunday(log_created_at)
+            values['history_days_at_step'][i] = getTimeGap(log_created_at, values['history_day_initiated'][i])
+            break
+
+        next_card_id = values['card_id'][i+1]
+        if card_id == next_card_id:
+            values['history_day_initiated'][i+1] = log_created_at
+            values['history_initiated_week_end'][i+1] = weekEndSunday(log_created_at)
+        else:
+            values['history_day_initiated'][i+1] = card_created_at
+            values['history_initiated_week_end'][i+1] = weekEndSunday(card_created_at)
+
+        values['history_day_completed'][i] = log_created_at
+        values['history_completed_week_end'][i] = weekEndSunday(log_created_at)
+        values['history_days_at_step'][i] = getTimeGap(log_created_at, values['history_day_initiated'][i])
+
+    return pd.DataFrame(values)
+
+
+def benchmarkWorkflowTimedeltas(row_count: int = 100000) -> object:
+    """
+    Time the per-row workflow timedelta loop against computeWorkflowTimedeltas on synthetic activity rows,
+    and check that both produce the same output row for row.
+    """
+    DF = syntheticWorkflowHistory(row_count)
+    today = date.today()
+
+    start_time = time.perf_counter()
+    legacy = legacyWorkflowTimedeltas(DF, today = datetime.strftime(today, f'%Y-%m-%d'))
+    legacy_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    vectorized = PCO_ETL.computeWorkflowTimedeltas(DF.copy(), today = today)
+    vectorized_seconds = time.perf_counter() - start_time
+
+    matches = legacy[WORKFLOW_TIMEDELTA_COLUMNS].astype(str).equals(vectorized[WORKFLOW_TIMEDELTA_COLUMNS].astype(str))
+    return pd.DataFrame([{'rows' : row_count, 
+                          'legacy_loop_seconds' : round(legacy_seconds, 3), 
+                          'vectorized_seconds' : round(vectorized_seconds, 3), 
+                          'speedup' : round(legacy_seconds / vectorized_seconds, 1), 
+                          'rows_match' : matches}])
+
+
+
+GROUP_DATE_COLUMNS = ['group_archived_at', 'group_created_at', 'event_starts_at', 'joined_at']
+GROUP_NORMALIZED_COLUMNS = ['phone_number', 'email_address', 'full_name'] + GROUP_DATE_COLUMNS + [f'{column}_week_end' for column in GROUP_DATE_COLUMNS]
+
+
+
+def syntheticGroupRows(row_count: int, seed: int = 0) -> object:
+    """
+    Build a joined groups frame shaped like DF_GROUPS_ALL just before contacts and dates are processed,
+    with empty contact lists and missing dates mixed in.
+    """
+    rng = np.random.default_rng(seed)
+    base = datetime(2023, 1, 1)
+    def timestamps(missing_rate: float) -> list:
+        return [None if missing else datetime.strftime(base + timedelta(days = int(day), seconds = int(second)), f'%Y-%m-%dT%H:%M:%SZ') 
+                for day, second, missing in zip(rng.integers(0, 600, row_count), rng.integers(0, 86400, row_count), rng.random(row_count) < missing_rate)]
+    def contacts(key: str, missing_rate: float) -> list:
+        return [[] if missing else [{key : f'{key}-{i}'}, {key : f'{key}-{i}-secondary'}] 
+                for i, missing in enumerate(rng.random(row_count) < missing_rate)]
+
+    DF = pd.DataFrame({
+        'first_name' : rng.choice(['Ada', 'Grace', 'Alan'], row_count).astype(object),
+        'last_name' : rng.choice(['Lovelace', 'Hopper', 'Turing'], row_count).astype(object),
+        'phone_number' : contacts('number', 0.2),
+        'email_address' : contacts('address', 0.1),
+        'group_archived_at' : timestamps(0.8),
+        'group_created_at' : timestamps(0.0),
+        'event_starts_at' : timestamps(0.05),
+        'joined_at' : timestamps(0.05),
+    })
+    DF['group_archived_at'] = DF['group_archived_at'].astype(str)
+    return DF
+
+
+def legacyGroupRows(DF_GROUPS_ALL: object) -> object:
+    """
+    The previous per-row 'Processing group dates' loop, kept only as a benchmark and equivalence baseline.
+    """
+    reformatTimestring, weekEndSunday = legacyReformatTimestring, legacyWeekEndSunday
+    values = {column : DF_GROUPS_ALL[column].to_numpy(dtype = object, copy = True) for column in DF_GROUPS_ALL.columns}
+    for column in ['full_name'] + [f'{column}_week_end' for column in GROUP_DATE_COLUMNS]:
+        values[column] = np.full(len(DF_GROUPS_ALL.index), '', dtype = object)
+
+    for i in range(len(DF_GROUPS_ALL.index)):
+        try:
+            values['phone_number'][i] = values['phone_number'][i][0]['number']
+        except IndexError:
+            values['phone_number'][i] = ''
+        try:
+            values['email_address'][i] = values['email_address'][i][0]['address']
+        except IndexError:
+            values['email_address'][i] = ''
+
+        for column in GROUP_DATE_COLUMNS:
+            try:
+                values[column][i] = reformatTimestring(values[column][i])
+                values[f'{column}_week_end'][i] = weekEndSunday(values[column][i])
+            except:
+                values[column][i] = ''
+                values[f'{column}_week_end'][i] = ''
+
+        values['full_name'][i] = f"{values['first_name'][i]} {values['last_name'][i]}"
+
+    return pd.DataFrame(values)
+
+
+def benchmarkGroupRows(row_count: int = 100000) -> object:
+    """
+    Time the per-row group contact/date loop against normalizeGroupRows on synthetic joined rows,
+    and check that both produce the same output row for row.
+    """
+    DF = syntheticGroupRows(row_count)
+
+    start_time = time.perf_counter()
+    legacy = legacyGroupRows(DF)
+    legacy_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    vectorized = PCO_ETL.normalizeGroupRows(DF.copy())
+    vectorized_seconds = time.perf_counter() - start_time
+
+    matches = legacy[GROUP_NORMALIZED_COLUMNS].astype(str).equals(vectorized[GROUP_NORMALIZED_COLUMNS].astype(str))
+    return pd.DataFrame([{'rows' : row_count, 
+                          'legacy_loop_seconds' : round(legacy_seconds, 3), 
+                          'vectorized_seconds' : round(vectorized_seconds, 3), 
+                          'speedup' : round(legacy_seconds / vectorized_seconds, 1), 
+                          'rows_match' : matches}])
+
+
+
+def syntheticRosterRows(row_count: int, plan_count: int = 40, seed: int = 0) -> object:
+    """
+    Build a roster frame shaped like DF_ALL_ROSTERS before plan dates are processed: thousands of rows over a few dozen
+    plan dates, with multi-day ('March 3 & 4, 2024') plans mixed in.
+    """
+    rng = np.random.default_rng(seed)
+    first_plan = date.today() - timedelta(weeks = plan_count // 2)
+    plans = []
+    for week in range(plan_count):
+        day = first_plan + timedelta(weeks = week)
+        following = day + timedelta(days = 1)
+        if week % 3 == 0 and following.month == day.month:
+            plans.append(f'{day:%B} {day.day} & {following.day}, {day.year}')
+        elif week % 3 == 0:
+            plans.append(f'{day:%B} {day.day} & {following:%B} {following.day}, {following.year}')
+        else:
+            plans.append(f'{day:%B} {day.day}, {day.year}')
+
+    return pd.DataFrame({
+        'person_id' : rng.integers(0, 2000, row_count).astype(str),
+        'team_name' : rng.choice(['Band', 'Tech', 'Hosting'], row_count).astype(object),
+        'plan_date' : np.array(plans, dtype = object)[rng.integers(0, plan_count, row_count)],
+    })
+
+
+def legacyPlanDates(DF_ALL_ROSTERS: object, today: str) -> object:
+    """
+    The previous per-row 'Processing Service Plan Dates' loop, kept only as a benchmark and equivalence baseline.
+    The full-column astype(str) copy per row is kept, as it was part of the original cost.
+    """
+    values = {column : DF_ALL_ROSTERS[column].to_numpy(dtype = object, copy = True) for column in DF_ALL_ROSTERS.columns}
+    values['future_plan'] = np.full(len(DF_ALL_ROSTERS.index), 'False', dtype = object)
+    old_format = f'%B %d, %Y'
+    new_format = f'%Y-%m-%d'
+
+    for i in range(len(DF_ALL_ROSTERS.index)):
+        date_value = pd.Series(values['plan_date']).astype(str).values[i]
+        if '&' in date_value:
+            broken = date_value.split(' ')
+            broken_date_value = broken[0] + ' ' + broken[1][0:2] + ', ' + broken[len(broken)-1][0:4]
+            old_string = datetime.strptime(broken_date_value, old_format)
+        else:
+            old_string = datetime.strptime(date_value, old_format)
+
+        plan_date = datetime.strftime(old_string, new_format)
+        values['plan_date'][i] = plan_date
+        if datetime.strptime(plan_date, new_format) >= datetime.strptime(today, new_format):
+            values['future_plan'][i] = 'True'
+
+    return pd.DataFrame(values)
+
+
+def benchmarkPlanDates(row_count: int = 5000) -> object:
+    """
+    Time the per-row plan date loop against normalizePlanDates on a synthetic roster,
+    and check that both produce the same output row for row.
+    """
+    DF = syntheticRosterRows(row_count)
+    today = date.today()
+
+    start_time = time.perf_counter()
+    legacy = legacyPlanDates(DF, today = datetime.strftime(today, f'%Y-%m-%d'))
+    legacy_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    vectorized = PCO_ETL.normalizePlanDates(DF.copy(), today = today)
+    vectorized_seconds = time.perf_counter() - start_time
+
+    matches = legacy[['plan_date', 'future_plan']].astype(str).equals(vectorized[['plan_date', 'future_plan']].astype(str))
+    return pd.DataFrame([{'rows' : row_count, 
+                          'legacy_loop_seconds' : round(legacy_seconds, 3), 
+                          'vectorized_seconds' : round(vectorized_seconds, 3), 
+                          'speedup' : round(legacy_seconds / vectorized_seconds, 1), 
+                          'rows_match' : matches}])
+
+
+
+class StandInSpreadsheet():
+    """
+    In-memory grids behind the Sheets stand-in. Sheets are created on first use with the Sheets default 1000 x 26 grid
+    and no frozen rows or columns, and every cleared or written cell is counted in 'cells_touched'.
+    """
+    def __init__(self):
+        self.sheets = {}
+        self.cells_touched = 0
+
+    def sheet(self, sheet_name: str) -> dict:
+        if sheet_name not in self.sheets:
+            self.sheets[sheet_name] = {'sheetId' : len(self.sheets) + 1, 'rowCount' : 1000, 'columnCount' : 26, 
+                                       'frozenRowCount' : 0, 'frozenColumnCount' : 0, 'rows' : []}
+        return self.sheets[sheet_name]
+
+    def apply(self, a1_range: str, values: list = None) -> None:
+        """
+        Apply a clear (values None) or a write of rows starting at column A, given an A1 range such as 'groups!A5:Z9'
+        or a bare sheet name for the whole sheet.
+        """
+        sheet_name, _, cells = unquote(a1_range).partition('!')
+        sheet = self.sheet(sheet_name)
+        bounds = re.match(r'^[A-Z]+(\d+)(?::([A-Z]+)(\d*))?$', cells) if cells else None
+        first_row = int(bounds.group(1)) - 1 if bounds else 0
+        rows = sheet['rows']
+        if values is None:
+            last_row = int(bounds.group(3)) if bounds and bounds.group(3) else sheet['rowCount']
+            last_column = columnNumber(bounds.group(2)) if bounds and bounds.group(2) else sheet['columnCount']
+            last_row = min(last_row, sheet['rowCount'])
+            for i in range(first_row, min(last_row, len(rows))):
+                rows[i] = [''] * min(last_column, len(rows[i])) + rows[i][last_column:]
+            self.cells_touched += max(last_row - first_row, 0) * last_column
+            return
+
+        # Like Sheets, a values write past the grid grows it
+        sheet['rowCount'] = max(sheet['rowCount'], first_row + len(values))
+        sheet['columnCount'] = max([sheet['columnCount']] + [len(row) for row in values])
+        if len(rows) < first_row + len(values):
+            rows.extend([] for _ in range(first_row + len(values) - len(rows)))
+        rows[first_row:first_row + len(values)] = [list(row) for row in values]
+        self.cells_touched += sum(len(row) for row in values)
+
+    def resize(self, sheet_id: int, row_count: int, column_count: int) -> None:
+        """
+        Resize a grid, rejecting the shapes Sheets rejects: an empty grid, or one without a row or column past the frozen ones.
+        """
+        sheet = self.sheetById(sheet_id)
+        if row_count < max(sheet['frozenRowCount'] + 1, 1) or column_count < max(sheet['frozenColumnCount'] + 1, 1):
+            raise ValueError(f'Invalid grid size {row_count} x {column_count}.')
+        sheet['rowCount'], sheet['columnCount'] = row_count, column_count
+        sheet['rows'] = [row[:column_count] for row in sheet['rows'][:row_count]]
+
+    def clearFrom(self, sheet_id: int, start_row: int = 0, start_column: int = 0) -> None:
+        """
+        Clear every cell from a 0-based row and column onwards, as an 'updateCells' request over an open-ended range does.
+        """
+        sheet = self.sheetById(sheet_id)
+        for i in range(start_row, len(sheet['rows'])):
+            row = sheet['rows'][i]
+            sheet['rows'][i] = row[:start_column] + [''] * max(len(row) - start_column, 0)
+        self.cells_touched += max(sheet['rowCount'] - start_row, 0) * max(sheet['columnCount'] - start_column, 0)
+
+    def sheetById(self, sheet_id: int) -> dict:
+        return next(sheet for sheet in self.sheets.values() if sheet['sheetId'] == sheet_id)
+
+    def properties(self) -> dict:
+        return {'sheets' : [{'properties' : {'sheetId' : sheet['sheetId'], 'title' : sheet_name, 
+                                             'gridProperties' : {key : sheet[key] for key in ['rowCount', 'columnCount', 'frozenRowCount', 'frozenColumnCount']}}} 
+                            for sheet_name, sheet in self.sheets.items()]}
+
+
+def columnNumber(letters: str) -> int:
+    """
+    The 1-based column number of A1 column letters, the inverse of PCO_ETL.columnLetter.
+    """
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - 64
+    return number
+
+
+class SheetsStandInHandler(BaseHTTPRequestHandler):
+    """
+    Answers the Sheets API calls GoogleAPIPush makes (spreadsheets get, batchUpdate with addSheet, updateSheetProperties
+    and updateCells requests, values update/clear and their batch forms), applying them to a StandInSpreadsheet
+    on the server so the resulting sheets can be checked.
+    Each request's method, path, JSON body and body size in bytes is recorded on the server.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        path = urlsplit(self.path).path
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        payload, status = {'spreadsheetId' : 'stand-in'}, 200
+        with self.server.lock:
+            self.server.received.append((self.command, self.path, body, length))
+            spreadsheet = self.server.spreadsheet
+            try:
+                # Reject the next 'failures' values.batchUpdate requests, as a 400 the client does not retry
+                if path.endswith('/values:batchUpdate') and self.server.failures > 0:
+                    self.server.failures -= 1
+                    raise ValueError('Injected failure.')
+                if path.endswith('/values:batchClear'):
+                    for a1_range in body['ranges']:
+                        spreadsheet.apply(a1_range)
+                elif path.endswith('/values:batchUpdate'):
+                    for value_range in body['data']:
+                        spreadsheet.apply(value_range['range'], value_range['values'])
+                elif path.endswith(':batchUpdate'):
+                    for request in body['requests']:
+                        if 'updateCells' in request:
+                            grid_range = request['updateCells']['range']
+                            spreadsheet.clearFrom(grid_range['sheetId'], grid_range.get('startRowIndex', 0), grid_range.get('startColumnIndex', 0))
+                            continue
+                        if 'addSheet' in request:
+                            properties = request['addSheet']['properties']
+                            properties['sheetId'] = spreadsheet.sheet(properties['title'])['sheetId']
+                        else:
+                            properties = request['updateSheetProperties']['properties']
+                        spreadsheet.resize(properties['sheetId'], properties['gridProperties']['rowCount'], properties['gridProperties']['columnCount'])
+                elif path.endswith(':clear'):
+                    spreadsheet.apply(path.rsplit('/', 1)[1][:-len(':clear')])
+                elif '/values/' in path:
+                    spreadsheet.apply(path.rsplit('/', 1)[1], body['values'])
+                elif self.command == 'GET':
+                    payload = spreadsheet.properties()
+            except ValueError as e:
+                payload, status = {'error' : {'code' : 400, 'message' : str(e)}}, 400
+
+        payload = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_PUT = do_POST = respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def standInSheets(latency: float = 0.0):
+    """
+    Run a plain-HTTP stand-in of the Sheets API for the duration of the block and yield the server,
+    whose 'received' list holds every request made to it and 'spreadsheet' the resulting sheets.
+    Setting 'failures' on the server makes that many of the following batchUpdate requests fail.
+    """
+    server_class = type('SheetsStandInServer', (ThreadingHTTPServer,), {'request_queue_size' : 1024, 'daemon_threads' : True})
+    server = server_class(('127.0.0.1', 0), SheetsStandInHandler)
+    server.received = []
+    server.spreadsheet = StandInSpreadsheet()
+    server.latency = latency
+    server.failures = 0
+    server.lock = threading.Lock()
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}/'
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+
+
+def standInUploader(server: object, sheet_state: object = None, max_workers: int = 4) -> object:
+    """
+    A GoogleAPIPush pointed at the Sheets stand-in, with anonymous credentials so no token is requested,
+    and no write quota to wait on.
+    """
+    if AnonymousCredentials is None:
+        raise ModuleNotFoundError("The Sheets benchmarks require 'google-api-python-client'. Consult 'requirements.txt'.")
+    return GoogleAPIPush(SCOPES = [], SERVICE_ACCOUNT_JSON = None, SPREADSHEET_ID = 'stand-in', 
+                         api_endpoint = server.base_url, credentials = AnonymousCredentials(), sheet_state = sheet_state, 
+                         max_workers = max_workers, limiter = RateLimiter(limit = 10000, period = 1))
+
+
+def standInSheetRows(server: object, sheet_name: str) -> list:
+    """
+    The non-empty rows of a stand-in sheet, header first.
+    """
+    with server.lock:
+        return [row for row in server.spreadsheet.sheet(sheet_name)['rows'] if any(cell != '' for cell in row)]
+
+
+def syntheticSheetFrame(row_count: int, column_count: int = 12, seed: int = 0) -> object:
+    """
+    A frame of short strings, the shape of the generator outputs pushed to the sheet.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({f'column_{j}' : rng.integers(0, 10000, row_count).astype(str) for j in range(column_count)})
+
+
+def timedPush(server: object, label: str, sheet_count: int, start_time: float) -> dict:
+    """
+    One benchmark row: elapsed time since start_time and the requests the stand-in received meanwhile (which are then reset).
+    """
+    seconds = time.perf_counter() - start_time
+    with server.lock:
+        request_count = len(server.received)
+        server.received.clear()
+    return {'push' : label, 'sheets' : sheet_count, 'requests' : request_count, 'seconds' : round(seconds, 3)}
+
+
+def benchmarkSheetPush(sheet_count: int = 4, row_count: int = 2000) -> object:
+    """
+    Time pushing sheet_count sheets when credentials and the Sheets service are built for every clear and push
+    (the previous behaviour), with one cached GoogleAPIPush, and with pushMany, all against the local Sheets stand-in.
+    """
+    DATAFRAME = syntheticSheetFrame(row_count)
+    sheet_names = [f'sheet_{i}' for i in range(sheet_count)]
+    results = []
+    with standInSheets() as server:
+        start_time = time.perf_counter()
+        for sheet_name in sheet_names:
+            standInUploader(server).sheetClear(sheet_name)
+            standInUploader(server).sheetPush(DATAFRAME, sheet_name)
+
+        results.append(timedPush(server, 'built per call, sheetClear + sheetPush per sheet', sheet_count, start_time))
+
+        start_time = time.perf_counter()
+        uploader = standInUploader(server)
+        for sheet_name in sheet_names:
+            uploader.pushData(DATAFRAME, sheet_name)
+        results.append(timedPush(server, 'cached, pushData per sheet', sheet_count, start_time))
+
+        start_time = time.perf_counter()
+        standInUploader(server).pushMany({sheet_name : DATAFRAME for sheet_name in sheet_names})
+        results.append(timedPush(server, 'cached, pushMany for all sheets', sheet_count, start_time))
+
+    return pd.DataFrame(results)
+
+
+def quietDayChanges(DATAFRAME: object, change_rate: float = 0.01, seed: int = 1) -> object:
+    """
+    The next day's version of a keyed sheet frame: a change_rate share of rows edited, half as many removed and half as many added.
+    """
+    rng = np.random.default_rng(seed)
+    NEXT = DATAFRAME.copy()
+    edited = rng.choice(len(NEXT.index), max(int(len(NEXT.index) * change_rate), 1), replace = False)
+    NEXT.loc[NEXT.index[edited], 'column_1'] = 'edited'
+    removed = rng.choice(len(NEXT.index), max(int(len(NEXT.index) * change_rate / 2), 1), replace = False)
+    NEXT = NEXT.drop(NEXT.index[removed])
+    ADDED = syntheticSheetFrame(max(int(len(DATAFRAME.index) * change_rate / 2), 1), seed = seed + 1)
+    ADDED['row_id'] = [f'new-{i}' for i in range(len(ADDED.index))]
+    return pd.concat([NEXT, ADDED], ignore_index = True).sample(frac = 1, random_state = seed)
+
+
+def sheetRowTuples(rows: list) -> list:
+    """
+    Rows as sorted tuples for comparing sheet contents, with NaN and None read as the empty cells Sheets stores for them.
+    """
+    return sorted(tuple('' if cell is None or cell != cell else cell for cell in row) for row in rows)
+
+
+def benchmarkSheetDiff(row_count: int = 20000, change_rate: float = 0.01, null_key_rate: float = 0.01) -> object:
+    """
+    Push a keyed sheet, then its next-day version with change_rate of rows edited, removed or added, once as a full
+    clear-and-rewrite and once as a diff push. Reports the payload sent for the second push and checks the stand-in
+    sheet ends up holding exactly the new rows. A null_key_rate share of rows have a null key, as left joins produce.
+    """
+    DATAFRAME = syntheticSheetFrame(row_count)
+    DATAFRAME['row_id'] = [f'row-{i}' for i in range(row_count)]
+    null_keys = np.random.default_rng(2).choice(row_count, int(row_count * null_key_rate), replace = False)
+    DATAFRAME.loc[DATAFRAME.index[null_keys], 'row_id'] = None
+    NEXT = quietDayChanges(DATAFRAME, change_rate)
+    expected = sheetRowTuples(NEXT.values.tolist())
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory, standInSheets() as server:
+        for label, sheet_state in [('full rewrite', None), ('diff', PCO_ETL.SheetStateStore(directory))]:
+            uploader = standInUploader(server, sheet_state = sheet_state)
+            uploader.pushMany({label : DATAFRAME}, key_columns = {label : ['row_id']})
+            with server.lock:
+                server.received.clear()
+
+            start_time = time.perf_counter()
+            uploader.pushMany({label : NEXT}, key_columns = {label : ['row_id']})
+            seconds = time.perf_counter() - start_time
+            with server.lock:
+                payload_bytes = sum(length for _, _, _, length in server.received)
+                request_count = len(server.received)
+            rows = standInSheetRows(server, label)
+            results.append({'push' : label, 
+                            'rows' : len(NEXT.index), 
+                            'requests' : request_count, 
+                            'payload_bytes' : payload_bytes, 
+                            'seconds' : round(seconds, 3), 
+                            'sheet_matches' : rows[0] == list(NEXT.columns) and sheetRowTuples(rows[1:]) == expected})
+
+    return pd.DataFrame(results)
+
+
+def singleRequestWrite(uploader: object, DATAFRAME: object, sheet_name: str) -> None:
+    """
+    Write the whole frame from A1 as one list of lists in a single values.update request.
+    """
+    uploader.sheetsService().spreadsheets().values().update(
+        spreadsheetId = uploader.SPREADSHEET_ID, range = f"{sheet_name}!A1", valueInputOption = "USER_ENTERED", 
+        body = {"values" : uploader.sheetValues(DATAFRAME.fillna(''))}).execute()
+
+
+def singleRequestPush(uploader: object, DATAFRAME: object, sheet_name: str) -> None:
+    """
+    The previous push: clear, then the whole frame as one list of lists in a single values.update request.
+    """
+    uploader.sheetClear(sheet_name)
+    singleRequestWrite(uploader, DATAFRAME, sheet_name)
+
+
+def benchmarkChunkedPush(row_count: int = 100000, column_count: int = 26, latency: float = 0.2) -> object:
+    """
+    Push a groups-sized frame as one request against chunked, concurrent pushMany, with simulated Sheets latency per request.
+    Then make one chunk fail, check pushMany leaves it pending, and that resumePush resends only that chunk.
+    """
+    DATAFRAME = syntheticSheetFrame(row_count, column_count = column_count)
+    expected = [list(DATAFRAME.columns)] + DATAFRAME.values.tolist()
+    results = []
+    with standInSheets(latency = latency) as server:
+        for label, push in [('single request', lambda uploader: singleRequestPush(uploader, DATAFRAME, label)), 
+                            ('chunked, 1 worker', lambda uploader: uploader.pushMany({label : DATAFRAME}, max_batch_cells = 50000)), 
+                            ('chunked, 4 workers', lambda uploader: uploader.pushMany({label : DATAFRAME}, max_batch_cells = 50000))]:
+            uploader = standInUploader(server, max_workers = 1 if '1 worker' in label else 4)
+            start_time = time.perf_counter()
+            push(uploader)
+            seconds = time.perf_counter() - start_time
+            with server.lock:
+                largest_request = max(length for _, _, _, length in server.received)
+                request_count = len(server.received)
+                server.received.clear()
+            results.append({'push' : label, 
+                            'rows' : row_count, 
+                            'requests' : request_count, 
+                            'largest_request_bytes' : largest_request, 
+                            'seconds' : round(seconds, 3), 
+                            'sheet_matches' : standInSheetRows(server, label) == expected})
+
+        uploader = standInUploader(server)
+        server.failures = 1
+        start_time = time.perf_counter()
+        try:
+            uploader.pushMany({'resumed' : DATAFRAME}, max_batch_cells = 50000)
+        except Exception:
+            pending_chunks = len(uploader.pending['batches'])
+        with server.lock:
+            server.received.clear()
+        uploader.resumePush()
+        with server.lock:
+            resent = len(server.received)
+        results.append({'push' : f'one chunk failed, {pending_chunks} pending, {resent} resent', 
+                        'rows' : row_count, 
+                        'requests' : None, 
+                        'largest_request_bytes' : None, 
+                        'seconds' : round(time.perf_counter() - start_time, 3), 
+                        'sheet_matches' : standInSheetRows(server, 'resumed') == expected})
+
+    return pd.DataFrame(results)
+
+
+def legacyRangePush(uploader: object, DATAFRAME: object, sheet_name: str) -> None:
+    """
+    The previous fixed-range push: clear 'A1:Z', then write the frame from A1, leaving the grid as it is.
+    """
+    uploader.sheetsService().spreadsheets().values().clear(
+        spreadsheetId = uploader.SPREADSHEET_ID, range = f"{sheet_name}!A1:Z", body = {}).execute()
+    singleRequestWrite(uploader, DATAFRAME, sheet_name)
+
+
+
+def benchmarkRangeSizing(row_count: int = 5000) -> object:
+    """
+    Push a 30-column frame, then a narrower frame with half the rows, to a sheet with the default 1000 x 26 grid:
+    once with the previous fixed 'A1:Z' clear and once with pushMany's exact ranges and grid resizing.
+    Reports the final grid, the stale cells left outside the frame, and the cells cleared or written by the second push.
+    """
+    WIDE = syntheticSheetFrame(row_count, column_count = 30)
+    NARROW = syntheticSheetFrame(row_count // 2, column_count = 20, seed = 1)
+    expected = [list(NARROW.columns)] + NARROW.values.tolist()
+
+    results = []
+    with standInSheets() as server:
+        for label, push in [('fixed A1:Z', lambda uploader, DATAFRAME, sheet_name: legacyRangePush(uploader, DATAFRAME, sheet_name)), 
+                            ('exact ranges + resize', lambda uploader, DATAFRAME, sheet_name: uploader.pushMany({sheet_name : DATAFRAME}))]:
+            uploader = standInUploader(server)
+            with server.lock:
+                server.spreadsheet.sheet(label)
+            push(uploader, WIDE, label)
+            with server.lock:
+                server.spreadsheet.cells_touched = 0
+            push(uploader, NARROW, label)
+
+            with server.lock:
+                sheet = server.spreadsheet.sheet(label)
+                stale_cells = sum(1 for i, row in enumerate(sheet['rows']) for j, cell in enumerate(row) 
+                                  if cell != '' and (i >= len(expected) or j >= len(NARROW.columns)))
+                results.append({'push' : label, 
+                                'grid' : f"{sheet['rowCount']} x {sheet['columnCount']}", 
+                                'frame' : f"{len(expected)} x {len(NARROW.columns)}", 
+                                'stale_cells' : stale_cells, 
+                                'cells_touched' : server.spreadsheet.cells_touched})
+
+    return pd.DataFrame(results)
+
+
+def syntheticStage(limiter: object, request_count: int, latency: float) -> int:
+    """
+    Stand-in for a fetch pipeline: request_count sequential requests of the given latency, each paced by the shared limiter.
+    """
+    for _ in range(request_count):
+        limiter.acquire()
+        time.sleep(latency)
+    return request_count
+
+
+def benchmarkStageScheduler(request_counts: dict = {'workflows' : 30, 'rosters' : 20, 'groups' : 10}, latency: float = 0.05) -> object:
+    """
+    Run three synthetic pipelines one after another and as runStages fetch stages, once with a rate budget that
+    never binds (latency-bound: concurrency approaches the longest pipeline) and once with a budget that does
+    (budget-bound: no schedule beats the total request count over the rate).
+    """
+    results = []
+    total_requests = sum(request_counts.values())
+    for budget, limit, period in [('latency-bound', 1000, 1.0), ('budget-bound', 10, 1.0)]:
+        for label in ['sequential', 'runStages']:
+            # Start with an empty bucket so the budget applies from the first request
+            limiter = RateLimiter(limit = limit, period = period)
+            limiter.tokens = 0.0 if budget == 'budget-bound' else limiter.tokens
+            start_time = time.time()
+            if label == 'sequential':
+                for request_count in request_counts.values():
+                    syntheticStage(limiter, request_count, latency)
+            else:
+                PCO_ETL.runStages({name : (lambda request_count = request_count: syntheticStage(limiter, request_count, latency), []) 
+                                   for name, request_count in request_counts.items()})
+            elapsed = time.time() - start_time
+            results.append({'budget' : budget, 
+                            'schedule' : label, 
+                            'seconds' : round(elapsed, 2), 
+                            'sum_of_stages' : round(total_requests * latency, 2), 
+                            'longest_stage' : round(max(request_counts.values()) * latency, 2), 
+                            'budget_floor' : round(total_requests / (limit / period), 2) if budget == 'budget-bound' else 0.0})
+
+    return pd.DataFrame(results)
+
+
+def benchmarkSharedFrames(latency: float = 0.1) -> object:
+    """
+    Run four generator-like stages that overlap on endpoints (the same 'teams' URL, the same URL with its query
+    parameters in another order) through runStages against canned single-page responses: once fetching every
+    request, once through parseJSONIncluded's shared frame cache with each stage as a frame consumer.
+    Reports requests made, wall time and the frames still cached once every stage has finished.
+    """
+    base = 'https://canned.invalid'
+    stage_urls = {'workflows' : [f'{base}/people/v2/campuses', f'{base}/people/v2/workflows', f'{base}/people/v2/people?include=emails&order=id'], 
+                  'groups' : [f'{base}/groups/v2/campuses', f'{base}/groups/v2/groups', f'{base}/people/v2/people?order=id&include=emails'], 
+                  'rosters' : [f'{base}/services/v2/service_types', f'{base}/services/v2/teams', f'{base}/services/v2/people'], 
+                  'hosting birthdays' : [f'{base}/services/v2/teams/', f'{base}/services/v2/people']}
+    page = {'data' : [cannedPersonRecord(i) for i in range(20)], 'links' : {}}
+    original_safeGET = PCO_ETL.safeGET
+    counter = {'requests' : 0}
+    counter_lock = threading.Lock()
+
+    def cannedGET(url, auth, **kwargs):
+        with counter_lock:
+            counter['requests'] += 1
+        time.sleep(latency)
+        return CannedResponse(page)
+
+    def stage(ENGINE, fetch, urls):
+        with ENGINE.consumingFrames():
+            return [fetch(url) for url in urls]
+
+    results = []
+    try:
+        PCO_ETL.safeGET = cannedGET
+        for label in ['fetch every request', 'shared frame cache']:
+            ENGINE = Exporter(api_app_id = 'canned', api_secret = 'canned')
+            fetch = (lambda url: ENGINE.toFrames(url, ENGINE.fetchPages(url))[0]) if label == 'fetch every request' else ENGINE.parseJSON
+            counter['requests'] = 0
+            start_time = time.perf_counter()
+            frames = PCO_ETL.runStages({name : (lambda urls = urls: stage(ENGINE, fetch, urls), []) for name, urls in stage_urls.items()})
+            elapsed = time.perf_counter() - start_time
+            results.append({'fetch' : label, 
+                            'frames' : sum(len(stage_frames) for stage_frames in frames.values()), 
+                            'requests' : counter['requests'], 
+                            'reused' : int(ENGINE.pageReport()['reused'].sum()), 
+                            'seconds' : round(elapsed, 3), 
+                            'cached_after' : len(ENGINE.frame_cache), 
+                            'frames_match' : all(df.equals(pd.json_normalize(page['data'])) for stage_frames in frames.values() for df in stage_frames)})
+            ENGINE.close()
+    finally:
+        PCO_ETL.safeGET = original_safeGET
+
+    return pd.DataFrame(results)
+
+
+def mockPeopleFixtures(person_count: int = 2000, child_count: int = 100) -> dict:
+    """
+    People with one sideloaded email each, plus child_count N+1 'workflow_cards' endpoints of three cards each.
+    """
+    fixtures = {'/people/v2/people' : {'data' : syntheticRecords('Person', person_count, 
+                                                                 relationships = lambda i: {'emails' : {'data' : [{'type' : 'Email', 'id' : str(i)}]}}), 
+                                       'included' : syntheticRecords('Email', person_count)}}
+    for person_id in range(1, child_count + 1):
+        fixtures[f'/people/v2/people/{person_id}/workflow_cards'] = {'data' : syntheticRecords('WorkflowCard', 3, start_id = 3 * person_id)}
+    return fixtures
+
+
+def benchmarkMockServer(person_count: int = 2000, child_count: int = 100, latency: float = 0.02) -> object:
+    """
+    Exercise the fetch layer against MockPCOServer: page size, parallel offset pages, thread pool vs. event loop,
+    injected 429s, and the real rate-limit headers (at 100 requests per 2 seconds rather than PCO's 20).
+    Each row fetches the paginated people endpoint with its sideloaded emails, then an N+1 fan-out.
+    """
+    person_url = PCO_ETL.PEOPLE_BASE + '?include=emails'
+    child_urls = [PCO_ETL.PEOPLE_BASE + f'/{person_id}/workflow_cards' for person_id in range(1, child_count + 1)]
+    unlimited = {'rate_limit' : 10**6, 'rate_period' : 20.0}
+    configurations = [('per_page 25, links.next', {}, unlimited, lambda root: Exporter('mock', 'mock', api_root = root, per_page = 25, parallel_pages = False)), 
+                      ('per_page 100, links.next', {}, unlimited, lambda root: Exporter('mock', 'mock', api_root = root, parallel_pages = False)), 
+                      ('per_page 100, parallel offsets', {}, unlimited, lambda root: Exporter('mock', 'mock', api_root = root)), 
+                      ('AsyncExporter', {}, unlimited, lambda root: AsyncExporter('mock', 'mock', api_root = root)), 
+                      ('429 on every 10th request', {'throttle_every' : 10, 'retry_after' : 0.05}, unlimited, lambda root: Exporter('mock', 'mock', api_root = root)), 
+                      ('rate limit 100 per 2s', {}, {'rate_limit' : 100, 'rate_period' : 2.0}, lambda root: Exporter('mock', 'mock', api_root = root))]
+
+    results = []
+    fixtures = mockPeopleFixtures(person_count, child_count)
+    for label, faults, rate, build in configurations:
+        server = MockPCOServer(fixtures, latency = latency, **faults, **rate)
+        with server as root_url:
+            ENGINE = build(root_url)
+            start_time = time.perf_counter()
+            DF_PEOPLE, PEOPLE_INCLUDED = ENGINE.parseJSONIncluded(person_url)
+            frames = ENGINE.parseJSONMany(child_urls, desc = label)
+            elapsed = time.perf_counter() - start_time
+            ENGINE.close()
+
+        results.append({'fetch' : label, 
+                        'requests' : server.stats()['requests'], 
+                        'throttled' : server.stats()['throttled'], 
+                        'seconds' : round(elapsed, 3), 
+                        'complete' : len(DF_PEOPLE) == person_count and len(PEOPLE_INCLUDED.get('Email', [])) == person_count 
+                                     and sum(len(df) for df in frames) == 3 * child_count})
+
+    return pd.DataFrame(results)
+
+
+# Generators run end to end against the mock API, and the sheets they feed
+END_TO_END_STAGES = ['workflowDFGenerator', 'groupDFGenerator', 'rosterDFGenerator']
+
+
+def peakRSS() -> float:
+    """
+    Peak resident set size of this process so far, in MB.
+
+    On Linux this is VmHWM, since ru_maxrss survives exec and a spawned process would report its parent's peak.
+    Elsewhere ru_maxrss is used (in bytes on macOS).
+    """
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def runGeneratorStage(api_root: str, stage: str) -> dict:
+    """
+    Run one generator against api_root and measure it. Called in a fresh process, so the peak RSS is the stage's own.
+    """
+    baseline = peakRSS()
+    # The mock's rate-limit headers resize the limiter after the first response
+    ENGINE = Exporter(api_app_id = 'mock', api_secret = 'mock', api_root = api_root, limiter = RateLimiter(limit = 10**6, period = 1))
+    start_time = time.perf_counter()
+    with redirect_stderr(io.StringIO()):
+        DATAFRAME = getattr(ENGINE, stage)()
+    elapsed = time.perf_counter() - start_time
+    ENGINE.close()
+    return {'seconds' : round(elapsed, 3), 
+            'rows' : len(DATAFRAME.index), 
+            'columns' : len(DATAFRAME.columns), 
+            'baseline_rss_mb' : round(baseline, 1), 
+            'peak_rss_mb' : round(peakRSS(), 1)}
+
+
+def benchmarkEndToEnd(scales: list = [1, 10], latency: float = 0.0, report_path: str = 'benchmark_report.json') -> object:
+    """
+    Run workflowDFGenerator, groupDFGenerator and rosterDFGenerator end to end against MockPCOServer serving
+    syntheticPCODataset at each scale (1x is roughly our own account; 100x takes minutes and several GB).
+
+    Each stage runs in its own spawned process; the report has its wall time, requests and 429s seen by the server,
+    output rows, peak RSS and growth over the process baseline, and time relative to the smallest scale.
+    It is also written as JSON to report_path (with the Python, pandas and platform versions) for comparing runs.
+    """
+    results = []
+    spawn = multiprocessing.get_context('spawn')
+    for scale in scales:
+        fixtures = syntheticPCODataset(scale)
+        records = sum(len(fixture['data']) + len(fixture.get('included', [])) for fixture in fixtures.values())
+        server = MockPCOServer(fixtures, latency = latency, rate_limit = 10**6)
+        with server as root_url:
+            for stage in END_TO_END_STAGES:
+                before = server.stats()
+                with ProcessPoolExecutor(max_workers = 1, mp_context = spawn) as executor:
+                    metrics = executor.submit(runGeneratorStage, root_url, stage).result()
+                after = server.stats()
+                results.append({'scale' : scale, 
+                                'stage' : stage, 
+                                'endpoints' : len(fixtures), 
+                                'records' : records, 
+                                'requests' : after['requests'] - before['requests'], 
+                                'throttled' : after['throttled'] - before['throttled'], 
+                                'mb_served' : round((after['bytes_sent'] - before['bytes_sent']) / 2**20, 1), 
+                                **metrics, 
+                                'rss_growth_mb' : round(metrics['peak_rss_mb'] - metrics['baseline_rss_mb'], 1)})
+        del fixtures
+
+    report = pd.DataFrame(results)
+    smallest = report.groupby('stage')['seconds'].transform('first')
+    report['seconds_vs_smallest_scale'] = (report['seconds'] / smallest).round(2)
+
+    if report_path is not None:
+        with open(report_path, 'w') as file:
+            json.dump({'generated_at' : datetime.now().isoformat(timespec = 'seconds'), 
+                       'python' : platform.python_version(), 
+                       'pandas' : pd.__version__, 
+                       'platform' : platform.platform(), 
+                       'cpu_count' : os.cpu_count(), 
+                       'latency' : latency, 
+                       'results' : report.to_dict(orient = 'records')}, file, indent = 1)
+    return report
+
+
+# Execute benchmarks here
+if __name__ == "__main__":
+    print("----- Page accumulation: parseJSON time vs. record count -----")
+    print(benchmarkPageAccumulation().to_string(index = False))
+
+    print("----- Pooled session: safeGET requests/sec against a local HTTPS stand-in -----")
+    print(benchmarkPooledSession().to_string(index = False))
+
+    print("----- N+1 fan-out: Exporter thread pool vs. AsyncExporter event loop -----")
+    print(benchmarkFanOut().to_string(index = False))
+
+    print("----- Workflow timedeltas: per-row loop vs. column operations -----")
+    print(benchmarkWorkflowTimedeltas().to_string(index = False))
+
+    print("----- Group contacts and dates: per-row loop vs. column operations -----")
+    print(benchmarkGroupRows().to_string(index = False))
+
+    print("----- Service plan dates: per-row loop vs. memoized column parse -----")
+    print(benchmarkPlanDates().to_string(index = False))
+
+    print("----- Date helpers: original scalar vs. memoized scalar vs. array forms -----")
+    print(benchmarkDateHelpers().to_string(index = False))
+
+    print("----- Sheets push: per-call client vs. cached client vs. pushMany, against a local Sheets stand-in -----")
+    print(benchmarkSheetPush().to_string(index = False))
+
+    print("----- Sheets diff push: next-day payload of a full rewrite vs. changed rows only -----")
+    print(benchmarkSheetDiff().to_string(index = False))
+
+    print("----- Large sheet push: one request vs. chunked concurrent batchUpdates, and resuming a failed chunk -----")
+    print(benchmarkChunkedPush().to_string(index = False))
+
+    print("----- Sheet ranges: fixed A1:Z clear vs. exact ranges with grid resizing -----")
+    print(benchmarkRangeSizing().to_string(index = False))
+
+    print("----- Pipeline scheduling: sequential vs. concurrent runStages under a shared rate budget -----")
+    print(benchmarkStageScheduler().to_string(index = False))
+
+    print("----- Shared frame cache: overlapping endpoints across pipelines, fetched once per run -----")
+    print(benchmarkSharedFrames().to_string(index = False))
+
+    print("----- Response cache: nightly refetch of slow-changing endpoints, with and without ETag revalidation -----")
+    print(benchmarkResponseCache().to_string(index = False))
+
+    print("----- Mock PCO server: fetch layer options, injected 429s and rate-limit headers, offline -----")
+    print(benchmarkMockServer().to_string(index = False))
+
+    print("----- End to end: all three generators against the mock API at 1x and 10x synthetic scale (see benchmark_report.json) -----")
+    print(benchmarkEndToEnd().to_string(index = False))
@@ -0,0 +1,487 @@
+# Import packages
+try:
+    from PCO_ETL import Exporter, PageAccumulator, PIPELINES, DEFAULT_PIPELINES, KEYS_FILE, loadKeys
+    import json
+    import os
+    import time
+    import random
+    import hashlib
+    from datetime import datetime, timedelta
+    import threading
+    import argparse
+    from collections import deque
+    from urllib.parse import urlsplit, parse_qsl, urlencode
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ModuleNotFoundError:
+    print("Ensure all packages are installed. Consult 'requirements.txt'.")
+
+
+
+# PCO's page size when a request does not set 'per_page', and the largest it accepts
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+# Record counts of a 1x synthetic dataset, roughly the size of our own PCO account; counts marked fixed do not scale
+SYNTHETIC_SIZES = {'people' : 2000,
+                   'campuses' : 3,              # fixed
+                   'workflows' : 8,             # fixed
+                   'steps_per_workflow' : 6,    # fixed
+                   'cards' : 600,
+                   'groups' : 60,
+                   'memberships_per_group' : 12,
+                   'events_per_group' : 6,
+                   'attendances_per_event' : 8,
+                   'service_types' : 3,         # fixed
+                   'teams' : 12,                # fixed
+                   'roster_people' : 500,
+                   'plans_per_service_type' : 26,
+                   'team_members_per_plan' : 15}
+# Group types kept by groupDFGenerator (connect groups and coach groups)
+SYNTHETIC_GROUP_TYPES = ['448283', '448862']
+
+
+
+#####----- FIXTURES -----#####
+def syntheticRecords(resource_type: str, count: int, start_id: int = 1, updated_at: str = '2024-01-01T00:00:00Z', relationships: object = None) -> list:
+    """
+    Build count JSON:API records of a resource type with sequential ids.
+
+    relationships, if given, is called with each record id and returns that record's 'relationships' dict.
+    """
+    records = []
+    for record_id in range(start_id, start_id + count):
+        records.append({'type' : resource_type,
+                        'id' : str(record_id),
+                        'attributes' : {'name' : f'{resource_type} {record_id}',
+                                        'created_at' : updated_at,
+                                        'updated_at' : updated_at},
+                        'relationships' : relationships(record_id) if relationships is not None else {},
+                        'links' : {}})
+    return records
+
+
+def fixturePath(url: str) -> str:
+    """
+    Reduce a URL or path to the key fixtures are stored under: its path without a trailing slash.
+    """
+    return urlsplit(url).path.rstrip('/')
+
+
+def saveFixtures(fixtures: dict, directory: str) -> None:
+    """
+    Write fixtures ({path : {'data' : records, 'included' : records}}) to a directory, one JSON file per path.
+    """
+    os.makedirs(directory, exist_ok = True)
+    for path, fixture in fixtures.items():
+        with open(os.path.join(directory, hashlib.sha1(path.encode()).hexdigest() + '.json'), 'w') as file:
+            json.dump({'path' : path, 'data' : fixture['data'], 'included' : fixture.get('included', [])}, file)
+
+
+def loadFixtures(directory: str) -> dict:
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as file:
+                fixture = json.load(file)
+            fixtures[fixture['path']] = {'data' : fixture['data'], 'included' : fixture['included']}
+    return fixtures
+
+
+def syntheticTimestamp(rng: random.Random, start_year: int = 2023, end_year: int = 2026) -> str:
+    moment = datetime(start_year, 1, 1) + timedelta(days = rng.randrange((end_year - start_year) * 365), seconds = rng.randrange(86400))
+    return datetime.strftime(moment, f'%Y-%m-%dT%H:%M:%SZ')
+
+
+def syntheticPCODataset(scale: float = 1, seed: int = 0) -> dict:
+    """
+    Build fixtures for every endpoint fetched by workflowDFGenerator, groupDFGenerator and rosterDFGenerator,
+    with SYNTHETIC_SIZES record counts multiplied by scale (fixed counts excepted) and ids that join across them.
+
+    People: people (with sideloaded emails), campuses, workflows, steps, cards and card activities.
+    Groups: group types, groups (also by campus), memberships (with sideloaded people), tags, events and attendances.
+    Services: service types, teams, people, plans and plan team members.
+    """
+    rng = random.Random(seed)
+    sizes = dict(SYNTHETIC_SIZES)
+    for name in ['people', 'cards', 'groups', 'roster_people', 'plans_per_service_type']:
+        sizes[name] = max(int(SYNTHETIC_SIZES[name] * scale), 1)
+    fixtures = {}
+
+    def reference(resource_type: str, record_id: object) -> dict:
+        return {'data' : {'type' : resource_type, 'id' : str(record_id)} if record_id is not None else None}
+
+    def record(resource_type: str, record_id: object, attributes: dict, relationships: dict = None) -> dict:
+        return {'type' : resource_type, 'id' : str(record_id), 'attributes' : attributes, 'relationships' : relationships or {}, 'links' : {}}
+
+    # PEOPLE -----------------------------------------------------------------------------------------------------------------------------
+    person_ids = list(range(1, sizes['people'] + 1))
+    campus_ids = list(range(1, sizes['campuses'] + 1))
+    fixtures['/people/v2/campuses'] = {'data' : [record('Campus', campus_id, {'name' : f'Campus {campus_id}'}) for campus_id in campus_ids]}
+    fixtures['/people/v2/people'] = {'data' : [record('Person', person_id, 
+                                                      {'name' : f'Person {person_id}', 'child' : rng.random() < 0.2, 'gender' : rng.choice(['M', 'F']), 
+                                                       'created_at' : syntheticTimestamp(rng), 'updated_at' : syntheticTimestamp(rng)}, 
+                                                      {'primary_campus' : reference('Campus', rng.choice(campus_ids)), 
+                                                       'emails' : {'data' : [{'type' : 'Email', 'id' : str(person_id)}]}}) for person_id in person_ids], 
+                                     'included' : [record('Email', person_id, {'address' : f'person{person_id}@example.com', 'primary' : True}) for person_id in person_ids]}
+
+    workflows, steps = [], {}
+    for workflow_id in range(1, sizes['workflows'] + 1):
+        workflows.append(record('Workflow', workflow_id, 
+                                {'name' : f"{'NEW PEOPLE' if workflow_id % 4 == 1 else 'WORKFLOW'} {workflow_id}", 'my_ready_card_count' : 0, 'completed_card_count' : 0}, 
+                                {'campus' : reference('Campus', rng.choice(campus_ids))}))
+        steps[workflow_id] = [workflow_id * 100 + sequence for sequence in range(sizes['steps_per_workflow'])]
+        fixtures[f'/people/v2/workflows/{workflow_id}/steps'] = {'data' : [record('Step', step_id, {'name' : f'Step {sequence}', 'sequence' : sequence}, 
+                                                                                  {'workflow' : reference('Workflow', workflow_id)}) 
+                                                                           for sequence, step_id in enumerate(steps[workflow_id])]}
+    fixtures['/people/v2/workflows'] = {'data' : workflows}
+
+    cards = {workflow_id : [] for workflow_id in steps}
+    for card_id in range(1, sizes['cards'] + 1):
+        workflow_id, person_id = rng.choice(list(steps)), rng.choice(person_ids)
+        stage = rng.choices(['ready', 'snoozed', 'completed', 'removed'], weights = [6, 1, 3, 1])[0]
+        reached = len(steps[workflow_id]) if stage == 'completed' else rng.randrange(len(steps[workflow_id]))
+        created_at = syntheticTimestamp(rng, 2023, 2024)
+        moved_at = [syntheticTimestamp(rng, 2024, 2026) for _ in range(reached)]
+        moved_at.sort()
+        cards[workflow_id].append(record('WorkflowCard', card_id, 
+                                         {'stage' : stage, 'created_at' : created_at, 'moved_to_step_at' : moved_at[-1] if moved_at else created_at, 'updated_at' : created_at}, 
+                                         {'person' : reference('Person', person_id), 'assignee' : reference('Person', rng.choice(person_ids)), 
+                                          'workflow' : reference('Workflow', workflow_id), 
+                                          'current_step' : reference('Step', steps[workflow_id][reached] if reached < len(steps[workflow_id]) else None)}))
+        fixtures[f'/people/v2/people/{person_id}/workflow_cards/{card_id}/activities'] = {'data' : [
+            record('WorkflowCardActivity', card_id * 100 + sequence, {'created_at' : moved_at[sequence], 'type' : 'step_completed'}, 
+                   {'workflow_card' : reference('WorkflowCard', card_id), 'workflow_step' : reference('Step', steps[workflow_id][sequence])}) 
+            for sequence in range(reached)]}
+    for workflow_id, workflow_cards in cards.items():
+        fixtures[f'/people/v2/workflows/{workflow_id}/cards'] = {'data' : workflow_cards}
+
+    # GROUPS -----------------------------------------------------------------------------------------------------------------------------
+    group_type_ids = SYNTHETIC_GROUP_TYPES + ['1']
+    fixtures['/groups/v2/group_types'] = {'data' : [record('GroupType', group_type_id, {'name' : f'Group type {group_type_id}'}) for group_type_id in group_type_ids]}
+    fixtures['/groups/v2/campuses'] = {'data' : [record('Campus', campus_id, {'name' : f'Campus {campus_id}'}) for campus_id in campus_ids]}
+
+    groups, events, groups_by_campus = [], [], {campus_id : [] for campus_id in campus_ids}
+    group_people = {}
+    for group_id in range(1, sizes['groups'] + 1):
+        members = rng.sample(person_ids, min(sizes['memberships_per_group'], len(person_ids)))
+        groups.append(record('Group', group_id, 
+                             {'name' : f'Group {group_id}', 'memberships_count' : len(members), 'created_at' : syntheticTimestamp(rng, 2023, 2024), 
+                              'archived_at' : syntheticTimestamp(rng, 2025, 2026) if rng.random() < 0.1 else None}, 
+                             {'group_type' : reference('GroupType', rng.choice(group_type_ids))}))
+        groups_by_campus[rng.choice(campus_ids)].append(record('Group', group_id, {'name' : f'Group {group_id}'}))
+        fixtures[f'/groups/v2/groups/{group_id}/memberships'] = {'data' : [record('Membership', group_id * 10**6 + person_id, 
+                                                                                  {'joined_at' : syntheticTimestamp(rng, 2023, 2025), 'role' : 'member'}, 
+                                                                                  {'group' : reference('Group', group_id), 'person' : reference('Person', person_id)}) 
+                                                                           for person_id in members]}
+        fixtures[f'/groups/v2/groups/{group_id}/memberships']['included'] = [record('Person', person_id, 
+                                                                                    {'first_name' : 'Person', 'last_name' : str(person_id), 
+                                                                                     'phone_numbers' : [{'number' : f'555-{person_id:07d}'}], 
+                                                                                     'email_addresses' : [{'address' : f'person{person_id}@example.com'}]}) 
+                                                                             for person_id in members]
+        fixtures[f'/groups/v2/groups/{group_id}/tags'] = {'data' : [record('Tag', group_id, {'name' : rng.choice(['Young adults', 'Families', 'Students'])})] 
+                                                                   if rng.random() < 0.7 else []}
+        group_people[group_id] = members
+
+        for event_number in range(sizes['events_per_group']):
+            event_id = group_id * 1000 + event_number
+            starts_at = syntheticTimestamp(rng, 2024, 2026)
+            events.append(record('Event', event_id, {'name' : f'Group {group_id} meeting', 'visitors_count' : rng.randrange(3), 'starts_at' : starts_at, 'updated_at' : starts_at}, 
+                                 {'group' : reference('Group', group_id)}))
+            fixtures[f'/groups/v2/events/{event_id}/attendances'] = {'data' : [record('Attendance', event_id * 1000 + i, {'attended' : rng.random() < 0.8, 'role' : 'member'}, 
+                                                                                      {'person' : reference('Person', person_id), 'event' : reference('Event', event_id)}) 
+                                                                               for i, person_id in enumerate(members[:sizes['attendances_per_event']])]}
+    fixtures['/groups/v2/groups'] = {'data' : groups}
+    fixtures['/groups/v2/events'] = {'data' : events}
+    for campus_id, campus_groups in groups_by_campus.items():
+        fixtures[f'/groups/v2/campuses/{campus_id}/groups'] = {'data' : campus_groups}
+
+    # SERVICES ---------------------------------------------------------------------------------------------------------------------------
+    service_type_ids = list(range(1, sizes['service_types'] + 1))
+    fixtures['/services/v2/service_types'] = {'data' : [record('ServiceType', service_type_id, 
+                                                               {'name' : f'SUNDAY SERVICES {service_type_id}' if service_type_id < len(service_type_ids) else 'MIDWEEK'}) 
+                                                        for service_type_id in service_type_ids]}
+    team_ids = list(range(1, sizes['teams'] + 1))
+    team_service_types = {team_id : rng.choice(service_type_ids) for team_id in team_ids}
+    fixtures['/services/v2/teams'] = {'data' : [record('Team', team_id, {'name' : f'Team {team_id}'}, {'service_type' : reference('ServiceType', team_service_types[team_id])}) 
+                                                for team_id in team_ids]}
+    roster_people = person_ids[:sizes['roster_people']]
+    fixtures['/services/v2/people'] = {'data' : [record('Person', person_id, {'full_name' : f'Person {person_id}', 'status' : 'active' if rng.random() < 0.9 else 'inactive', 
+                                                                              'passed_background_check' : rng.random() < 0.7}) 
+                                                 for person_id in roster_people]}
+
+    for service_type_id in service_type_ids:
+        plans = []
+        for plan_number in range(sizes['plans_per_service_type']):
+            plan_id = service_type_id * 10**6 + plan_number
+            # Weekly plans; some span two days, which PCO writes as 'March 3 & 4, 2024'
+            day = datetime(2024, 1, 7) + timedelta(weeks = plan_number % 150)
+            dates = f'{day:%B} {day.day}, {day.year}' if rng.random() < 0.9 else f'{day:%B} {day.day} & {day.day + 1 if day.day < 28 else day.day}, {day.year}'
+
+            plans.append(record('Plan', plan_id, {'dates' : dates, 'plan_people_count' : sizes['team_members_per_plan']}, {'service_type' : reference('ServiceType', service_type_id)}))
+            fixtures[f'/services/v2/service_types/{service_type_id}/plans/{plan_id}/team_members'] = {'data' : [
+                record('PlanPerson', plan_id * 100 + i, {'status' : rng.choice(['C', 'U', 'D']), 'name' : f'Person {person_id}'}, 
+                       {'plan' : reference('Plan', plan_id), 'person' : reference('Person', person_id), 'scheduled_by' : reference('Person', rng.choice(roster_people)), 
+                        'service_type' : reference('ServiceType', service_type_id), 'team' : reference('Team', rng.choice(team_ids))}) 
+                for i, person_id in enumerate(rng.sample(roster_people, min(sizes['team_members_per_plan'], len(roster_people))))]}
+        fixtures[f'/services/v2/service_types/{service_type_id}/plans'] = {'data' : plans}
+
+    return fixtures
+
+
+class RecordingExporter(Exporter):
+    """
+    Exporter that keeps every endpoint it fetches as a fixture, so a live run can be replayed by MockPCOServer.
+
+    Records are stored unfiltered: use it without a SyncStore, so that incremental endpoints are fetched in full.
+    """
+    def __init__(self, api_app_id: str, api_secret: str, **kwargs):
+        super().__init__(api_app_id, api_secret, **kwargs)
+        self.fixtures = {}
+        self.fixtures_lock = threading.Lock()
+
+    def fetchAllPages(self, url: str) -> PageAccumulator:
+        pages = super().fetchAllPages(url)
+        included = [record for records in pages.included.values() for record in records.values()]
+        with self.fixtures_lock:
+            fixture = self.fixtures.setdefault(fixturePath(url), {'data' : [], 'included' : []})
+            # The same path may be fetched with different 'include=' parameters; keep the fullest copy
+            if len(pages.records) >= len(fixture['data']):
+                fixture['data'] = pages.records
+            fixture['included'] = list({(record.get('type'), record.get('id')) : record for record in fixture['included'] + included}.values())
+        return pages
+
+
+
+#####----- SERVER -----#####
+class MockPCOHandler(BaseHTTPRequestHandler):
+    """
+    Hands every GET to the MockPCOServer that owns the HTTP server, over HTTP/1.1 so connections can be kept alive.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.mock.respond(self)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockPCOServer():
+    """
+    Local stand-in for the PCO API serving fixtures with PCO's JSON:API pagination, so Exporter, its retries
+    and its concurrency options can be exercised without credentials.
+
+    Pages follow 'per_page' (default 25, at most 100) and 'offset', and carry 'meta.total_count', 'meta.next'
+    and 'links.next'. 'include=' sideloads the related records of the page from the fixture's 'included' records,
+    and 'where[updated_at][gte]' filters on 'attributes.updated_at'. Unknown paths return a 404, as PCO does.
+
+    Every response carries the 'X-PCO-API-Request-Rate-*' headers of a sliding window of rate_limit requests per
+    rate_period seconds; past the limit (with enforce_rate_limit) a request gets a 429 with 'Retry-After'.
+    throttle_every additionally turns every n-th request into a 429, and latency delays every response.
+    Pages carry an 'ETag', and a matching 'If-None-Match' gets an empty 304.
+    """
+    def __init__(self, fixtures: dict = None, latency: float = 0.0, rate_limit: int = 100, rate_period: float = 20.0, enforce_rate_limit: bool = True,
+                 throttle_every: int = 0, retry_after: float = 1.0, host: str = '127.0.0.1', port: int = 0):
+        self.fixtures = {}
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.enforce_rate_limit = enforce_rate_limit
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.address = (host, port)
+        self.httpd = None
+
+        self.window = deque()
+        self.lock = threading.Lock()
+        # Reporting counters
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+        for path, fixture in (fixtures or {}).items():
+            self.addFixture(path, fixture['data'], fixture.get('included', []))
+
+    def addFixture(self, path: str, data: list, included: list = None) -> None:
+        """
+        Serve records (a list, or a single record for single-resource endpoints) at path, with the records they may sideload.
+        """
+        self.fixtures[fixturePath(path)] = {'data' : data,
+                                            'included' : {(record.get('type'), record.get('id')) : record for record in included or []}}
+
+    def start(self) -> str:
+        """
+        Serve on a background thread and return the server's root URL, to pass as an Exporter's api_root.
+        """
+        server_class = type('MockPCOHTTPServer', (ThreadingHTTPServer,), {'request_queue_size' : 1024, 'daemon_threads' : True})
+        self.httpd = server_class(self.address, MockPCOHandler)
+        self.httpd.mock = self
+        threading.Thread(target = self.httpd.serve_forever, daemon = True).start()
+        return self.rootURL()
+
+    def stop(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def rootURL(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'requests' : self.requests,
+                    'throttled' : self.throttled,
+                    'not_modified' : self.not_modified,
+                    'bytes_sent' : self.bytes_sent}
+
+    def admit(self) -> tuple:
+        """
+        Count a request against the rate window. Returns the window count and, for a request to throttle, its 'Retry-After'.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.requests += 1
+            while self.window and now - self.window[0] >= self.rate_period:
+                self.window.popleft()
+
+            if self.throttle_every and self.requests % self.throttle_every == 0:
+                self.throttled += 1
+                return len(self.window), self.retry_after
+            if self.enforce_rate_limit and len(self.window) >= self.rate_limit:
+                self.throttled += 1
+                return len(self.window), max(self.rate_period - (now - self.window[0]), 0.0)
+            self.window.append(now)
+            return len(self.window), None
+
+    def page(self, path: str, query: dict) -> dict:
+        """
+        Build the JSON:API payload for a request, or None when nothing is served at path.
+        """
+        fixture = self.fixtures.get(path)
+        if fixture is None:
+            return None
+        records = fixture['data']
+        if isinstance(records, dict):
+            return {'data' : records, 'included' : [], 'meta' : {}, 'links' : {'self' : self.rootURL() + path}}
+
+        updated_since = query.get('where[updated_at][gte]')
+        if updated_since:
+            records = [record for record in records if record.get('attributes', {}).get('updated_at', '') >= updated_since]
+
+        per_page = min(max(int(query.get('per_page', DEFAULT_PER_PAGE)), 1), MAX_PER_PAGE)
+        offset = max(int(query.get('offset', 0)), 0)
+        data = records[offset:offset + per_page]
+
+        # Sideload the records that this page's relationships point at
+        included = {}
+        for relationship in filter(None, query.get('include', '').split(',')):
+            for record in data:
+                linkage = record.get('relationships', {}).get(relationship, {}).get('data')
+                for reference in (linkage if isinstance(linkage, list) else [linkage] if linkage else []):
+                    key = (reference.get('type'), reference.get('id'))
+                    if key in fixture['included']:
+                        included[key] = fixture['included'][key]
+
+        payload = {'links' : {'self' : f'{self.rootURL()}{path}?{urlencode(query, safe = ",[]:")}'},
+                   'data' : data,
+                   'included' : list(included.values()),
+                   'meta' : {'total_count' : len(records), 'count' : len(data)}}
+        if offset + per_page < len(records):
+            next_query = dict(query, per_page = per_page, offset = offset + per_page)
+            payload['links']['next'] = f'{self.rootURL()}{path}?{urlencode(next_query, safe = ",[]:")}'
+            payload['meta']['next'] = {'offset' : offset + per_page}
+        return payload
+
+    def respond(self, handler: BaseHTTPRequestHandler) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        count, retry_after = self.admit()
+        headers = {'X-PCO-API-Request-Rate-Limit' : str(self.rate_limit),
+                   'X-PCO-API-Request-Rate-Period' : str(int(self.rate_period)),
+                   'X-PCO-API-Request-Rate-Count' : str(count)}
+
+        parts = urlsplit(handler.path)
+        if retry_after is not None:
+            status, headers['Retry-After'] = 429, f'{retry_after:g}'
+            body = json.dumps({'errors' : [{'status' : '429', 'title' : 'Too Many Requests'}]}).encode()
+        else:
+            payload = self.page(fixturePath(parts.path), dict(parse_qsl(parts.query, keep_blank_values = True)))
+            if payload is None:
+                status, body = 404, json.dumps({'errors' : [{'status' : '404', 'title' : 'Not Found'}]}).encode()
+            else:
+                status, body = 200, json.dumps(payload).encode()
+                headers['ETag'] = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if handler.headers.get('If-None-Match') == headers['ETag']:
+                    status, body = 304, b''
+                    with self.lock:
+                        self.not_modified += 1
+
+        with self.lock:
+            self.bytes_sent += len(body)
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/vnd.api+json')
+        handler.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+
+#####----- COMMAND LINE -----#####
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description = 'Record PCO API fixtures, or serve them from a local mock PCO API.')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    record = commands.add_parser('record', help = 'Run pipelines against the live API and save every endpoint fetched as fixtures.')
+    record.add_argument('directory', help = 'Directory to write the fixtures to.')
+    record.add_argument('pipelines', nargs = '*', metavar = 'PIPELINE', help = f"Pipelines to run (default: {' '.join(DEFAULT_PIPELINES)}).")
+    record.add_argument('--keys', default = KEYS_FILE, help = 'File with the PCO app id and secret.')
+
+    serve = commands.add_parser('serve', help = 'Serve recorded fixtures until interrupted.')
+    serve.add_argument('directory', help = 'Directory of recorded fixtures.')
+    serve.add_argument('--port', type = int, default = 8000)
+    serve.add_argument('--latency', type = float, default = 0.0, help = 'Seconds added to every response.')
+    serve.add_argument('--rate-limit', type = int, default = 100, help = 'Requests allowed per rate period.')
+    serve.add_argument('--rate-period', type = float, default = 20.0, help = 'Rate period in seconds.')
+    serve.add_argument('--throttle-every', type = int, default = 0, help = 'Answer every n-th request with a 429.')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        unknown = [pipeline for pipeline in args.pipelines if pipeline not in PIPELINES]
+        if unknown:
+            parser.error(f"unknown pipeline(s) {', '.join(unknown)}; choose from {', '.join(PIPELINES)}")
+        API_APP_ID, API_SECRET, _ = loadKeys(args.keys)
+        _ENGINE_ = RecordingExporter(api_app_id = API_APP_ID, api_secret = API_SECRET)
+        for pipeline in args.pipelines or DEFAULT_PIPELINES:
+            PIPELINES[pipeline](_ENGINE_)
+        _ENGINE_.close()
+        saveFixtures(_ENGINE_.fixtures, args.directory)
+        print(f"Recorded {len(_ENGINE_.fixtures)} endpoints to '{args.directory}'.")
+        return
+
+    server = MockPCOServer(loadFixtures(args.directory), latency = args.latency, rate_limit = args.rate_limit, rate_period = args.rate_period,
+                           throttle_every = args.throttle_every, port = args.port)
+    root_url = server.start()
+    print(f"Serving {len(server.fixtures)} endpoints at {root_url}; run 'python PCO_ETL.py --api-root {root_url}'. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+        print(f"Stopped: {server.stats()}")
+
+
+
+if __name__ == "__main__":
+    main()